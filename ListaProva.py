@@ -1,6 +1,8 @@
 #Aqui estão todas as provas separadas por código, são utilizadas apenas as provas azuis para
 #que haja uma padronização. Num futuro pretendo adicionar na API as questões da prova de reaplicação.
 
+from types import MappingProxyType
+
 provas_regulares = {
     "2009": {
         "CH": 53,
@@ -99,3 +101,11 @@ provas_regulares = {
         "LC": 1395
     }
 }
+
+# Tabela de consulta derivada, montada uma única vez na importação e
+# imutável: (ano, área) -> código da prova.
+CODE_BY_YEAR_AREA = MappingProxyType({
+    (int(ano), area): codigo
+    for ano, areas in provas_regulares.items()
+    for area, codigo in areas.items()
+})
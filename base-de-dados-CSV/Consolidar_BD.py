@@ -1,76 +1,150 @@
 import pandas as pd
-import glob
 import re
 import os
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
 # Caminho para a pasta com os arquivos
 # IMPORTANTE: Modifique este caminho para onde estão seus arquivos
 pasta = os.path.dirname(os.path.abspath(__file__))  # Pega o diretório do script
 
 print(f"Procurando arquivos em: {pasta}\n")
 
+# Padrão do nome dos arquivos anuais (o consolidado não casa com ele)
+padrao_arquivo = re.compile(r'ITENS_PROVA_(\d{4})\.csv')
+
+# Tamanho dos blocos lidos de cada arquivo (evita carregar tudo na memória)
+TAMANHO_BLOCO = 200_000
+
+# Colunas gravadas como número no Parquet
+COLUNAS_NUMERICAS = ['CO_HABILIDADE', 'NU_PARAM_A', 'NU_PARAM_B', 'NU_PARAM_C']
+COLUNAS_INTEIRAS = ['CO_POSICAO']
+
+
+def esquema_parquet(colunas):
+    """Esquema fixo do Parquet: números, posição e ano inteiros e o restante como texto."""
+    tipos = {col: pa.float64() for col in COLUNAS_NUMERICAS}
+    tipos.update({col: pa.int64() for col in COLUNAS_INTEIRAS})
+    tipos['ANO_PROVA'] = pa.int64()
+    return pa.schema([(col, tipos.get(col, pa.string())) for col in colunas])
+
+
+def bloco_para_parquet(bloco, esquema):
+    """Converte um bloco já reindexado para uma tabela com o esquema fixo."""
+    convertido = {}
+    for campo in esquema:
+        coluna = bloco[campo.name]
+        if campo.name in COLUNAS_NUMERICAS:
+            # Os CSVs do INEP usam vírgula como separador decimal
+            coluna = pd.to_numeric(
+                coluna.astype('string').str.replace(',', '.', regex=False), errors='coerce'
+            )
+        elif campo.name in COLUNAS_INTEIRAS:
+            # Inteiro anulável: posições ausentes viram nulo em vez de falhar
+            coluna = pd.to_numeric(coluna, errors='coerce').astype('Int64')
+        elif campo.name != 'ANO_PROVA':
+            coluna = coluna.astype('string')
+        convertido[campo.name] = coluna
+    return pa.Table.from_pandas(pd.DataFrame(convertido), schema=esquema, preserve_index=False)
+
 # Debug: lista todos os arquivos CSV na pasta
 print("=== DEBUG: Listando todos os arquivos CSV na pasta ===")
-todos_csv = glob.glob(os.path.join(pasta, '*.csv'))
-if not todos_csv:
-    # Tenta também listar arquivos sem usar glob
-    print("Tentando listar arquivos diretamente...")
-    try:
-        todos_arquivos = os.listdir(pasta)
-        todos_csv = [os.path.join(pasta, f) for f in todos_arquivos if f.endswith('.csv')]
-    except Exception as e:
-        print(f"Erro ao listar arquivos: {e}")
-for f in todos_csv:
-    print(f"  - {os.path.basename(f)}")
+todos_csv = []
+arquivos_validos = []
+try:
+    # Uma única varredura do diretório, extraindo o ano do nome
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if not (entrada.name.endswith('.csv') and entrada.is_file()):
+                continue
+            todos_csv.append(entrada.name)
+            match = padrao_arquivo.fullmatch(entrada.name)
+            if match:
+                arquivos_validos.append((entrada.path, match.group(1)))
+            elif 'ITENS_PROVA_' in entrada.name and entrada.name != 'ITENS_PROVA_CONSOLIDADO.csv':
+                print(f"AVISO: Não foi possível extrair o ano do arquivo: {entrada.name}")
+except OSError as e:
+    print(f"Erro ao listar arquivos: {e}")
+for nome in sorted(todos_csv):
+    print(f"  - {nome}")
 print(f"Total de CSVs encontrados: {len(todos_csv)}\n")
 
-# Busca todos os arquivos CSV que seguem o padrão do nome
-arquivos = [f for f in todos_csv if 'ITENS_PROVA_' in os.path.basename(f) and f != 'ITENS_PROVA_CONSOLIDADO.csv']
-
 # Ordena os arquivos por nome
-arquivos.sort()
+arquivos_validos.sort()
 
-# Lista para armazenar os dataframes
-dfs = []
+print(f"Arquivos ITENS_PROVA encontrados: {len(arquivos_validos)}\n")
 
-print(f"Arquivos ITENS_PROVA encontrados: {len(arquivos)}\n")
-
-for arquivo in arquivos:
-    # Extrai o ano do nome do arquivo usando regex
-    match = re.search(r'ITENS_PROVA_(\d{4})\.csv', os.path.basename(arquivo))
+if arquivos_validos:
+    # As colunas variam entre os anos: lê só os cabeçalhos para montar a união,
+    # na mesma ordem que o pd.concat usaria
+    colunas = []
+    for arquivo, _ in arquivos_validos:
+        for coluna in pd.read_csv(arquivo, sep=';', encoding='latin1', nrows=0).columns:
+            if coluna not in colunas:
+                colunas.append(coluna)
+    colunas.append('ANO_PROVA')
+    
+    anos_presentes = []
+    total_registros = 0
+    cabecalho_escrito = False
+    primeiras_linhas = None
+    ultimas_linhas = None
     
-    if match:
-        ano = match.group(1)
-        print(f"Processando arquivo: {os.path.basename(arquivo)} - Ano: {ano}")
-        
-        # Lê o arquivo CSV com separador ponto e vírgula
-        df = pd.read_csv(arquivo, sep=';', encoding='latin1')
-        
-        # Adiciona a coluna ANO_PROVA
-        df['ANO_PROVA'] = int(ano)
-        
-        # Adiciona à lista
-        dfs.append(df)
+    arquivo_saida = 'ITENS_PROVA_CONSOLIDADO.csv'
+    
+    # Parquet é o formato preferencial para leitura (colunar e já tipado);
+    # é gravado no mesmo laço que o CSV, mantido para compatibilidade
+    arquivo_parquet = 'ITENS_PROVA_CONSOLIDADO.parquet'
+    escritor_parquet = None
+    if pq is not None:
+        esquema = esquema_parquet(colunas)
+        escritor_parquet = pq.ParquetWriter(arquivo_parquet, esquema, compression='snappy')
     else:
-        print(f"AVISO: Não foi possível extrair o ano do arquivo: {os.path.basename(arquivo)}")
-
-# Concatena todos os dataframes
-if dfs:
-    df_consolidado = pd.concat(dfs, ignore_index=True)
+        print("AVISO: Parquet não gerado (instale o pyarrow)")
+    
+    # Grava bloco a bloco nos arquivos consolidados
+    with open(arquivo_saida, 'w', encoding='utf-8', newline='') as saida:
+        for arquivo, ano in arquivos_validos:
+            print(f"Processando arquivo: {os.path.basename(arquivo)} - Ano: {ano}")
+            
+            # Lê o arquivo CSV com separador ponto e vírgula
+            blocos = pd.read_csv(arquivo, sep=';', encoding='latin1', chunksize=TAMANHO_BLOCO)
+            
+            for bloco in blocos:
+                # Adiciona a coluna ANO_PROVA
+                bloco['ANO_PROVA'] = int(ano)
+                bloco = bloco.reindex(columns=colunas)
+                
+                bloco.to_csv(saida, sep=';', index=False, header=not cabecalho_escrito)
+                cabecalho_escrito = True
+                
+                if escritor_parquet is not None:
+                    escritor_parquet.write_table(bloco_para_parquet(bloco, esquema))
+                
+                total_registros += len(bloco)
+                if primeiras_linhas is None:
+                    primeiras_linhas = bloco.head()
+                ultimas_linhas = pd.concat([ultimas_linhas, bloco.tail()]).tail()
+            
+            anos_presentes.append(int(ano))
+    
+    if escritor_parquet is not None:
+        escritor_parquet.close()
+        print(f"Arquivo Parquet salvo como: {arquivo_parquet}")
     
     print(f"\n{'='*60}")
-    print(f"Total de registros consolidados: {len(df_consolidado)}")
-    print(f"Anos presentes: {sorted(df_consolidado['ANO_PROVA'].unique())}")
+    print(f"Total de registros consolidados: {total_registros}")
+    print(f"Anos presentes: {sorted(anos_presentes)}")
     print(f"{'='*60}\n")
     
-    # Salva o arquivo consolidado
-    arquivo_saida = 'ITENS_PROVA_CONSOLIDADO.csv'
-    df_consolidado.to_csv(arquivo_saida, sep=';', index=False, encoding='utf-8')
-    
     print(f"Arquivo consolidado salvo como: {arquivo_saida}")
     print(f"\nPrimeiras linhas do arquivo consolidado:")
-    print(df_consolidado.head())
+    print(primeiras_linhas)
     print(f"\nÚltimas linhas do arquivo consolidado:")
-    print(df_consolidado.tail())
+    print(ultimas_linhas)
 else:
-    print("Nenhum arquivo foi processado. Verifique o caminho e o padrão dos nomes dos arquivos.")
\ No newline at end of file
+    print("Nenhum arquivo foi processado. Verifique o caminho e o padrão dos nomes dos arquivos.")
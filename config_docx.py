@@ -6,6 +6,12 @@ import re
 from typing import Optional, Dict, Any
 
 
+# Nomes qualificados resolvidos uma única vez
+_QN_COLS, _QN_NUM, _QN_SPACE, _QN_SEP, _QN_VAL, _QN_SZ, _QN_COLOR, _QN_XML_SPACE = map(
+    ns.qn, ("w:cols", "w:num", "w:space", "w:sep", "w:val", "w:sz", "w:color", "xml:space")
+)
+
+
 class DocumentFormatter:
     """Classe para gerenciar formatação de documentos Word."""
     
@@ -16,6 +22,19 @@ class DocumentFormatter:
     DEFAULT_COLUMNS = {"num": 2, "space": 200, "sep": True}
     DEFAULT_BORDER = {"style": "single", "size": 2, "space": 5, "color": "000000"}
     
+    # Atributos XML derivados das configurações padrão (não mudam)
+    COLUMN_ATTRS = (
+        (_QN_NUM, str(DEFAULT_COLUMNS["num"])),
+        (_QN_SPACE, str(DEFAULT_COLUMNS["space"])),
+        (_QN_SEP, str(DEFAULT_COLUMNS["sep"]).lower()),
+    )
+    BORDER_ATTRS = (
+        (_QN_VAL, DEFAULT_BORDER["style"]),
+        (_QN_SZ, str(DEFAULT_BORDER["size"])),
+        (_QN_SPACE, str(DEFAULT_BORDER["space"])),
+        (_QN_COLOR, DEFAULT_BORDER["color"]),
+    )
+    
     def __init__(self, doc):
         """Inicializa o formatador com um documento."""
         self.doc = doc
@@ -55,7 +74,7 @@ class DocumentFormatter:
     def _configurar_colunas(self):
         """Configura as colunas do documento."""
         # Remove configurações anteriores de colunas
-        for child in self.sectPr.findall(ns.qn("w:cols")):
+        for child in self.sectPr.findall(_QN_COLS):
             self.sectPr.remove(child)
         
         # Adiciona nova configuração de colunas
@@ -65,9 +84,8 @@ class DocumentFormatter:
     def _criar_elemento_colunas(self) -> OxmlElement:
         """Cria elemento XML para configuração de colunas."""
         cols = OxmlElement("w:cols")
-        cols.set(ns.qn("w:num"), str(self.DEFAULT_COLUMNS["num"]))
-        cols.set(ns.qn("w:space"), str(self.DEFAULT_COLUMNS["space"]))
-        cols.set(ns.qn("w:sep"), str(self.DEFAULT_COLUMNS["sep"]).lower())
+        for nome, valor in self.COLUMN_ATTRS:
+            cols.set(nome, valor)
         return cols
     
     def _configurar_bordas(self):
@@ -83,33 +101,40 @@ class DocumentFormatter:
     def _criar_elemento_borda(self, lado: str) -> OxmlElement:
         """Cria elemento XML para uma borda específica."""
         borda = OxmlElement(f"w:{lado}")
-        borda.set(ns.qn("w:val"), self.DEFAULT_BORDER["style"])
-        borda.set(ns.qn("w:sz"), str(self.DEFAULT_BORDER["size"]))
-        borda.set(ns.qn("w:space"), str(self.DEFAULT_BORDER["space"]))
-        borda.set(ns.qn("w:color"), self.DEFAULT_BORDER["color"])
+        for nome, valor in self.BORDER_ATTRS:
+            borda.set(nome, valor)
         return borda
 
 
 class ParagraphFormatter:
     """Classe para formatação de parágrafos com estilos especiais."""
     
-    # Padrões de regex para formatação
+    # Padrões de regex para formatação, na ordem dos grupos de FORMATACOES
     PATTERNS = {
-        "bold": (r"\*\*(?:.*?)\*\*", lambda run: setattr(run, 'bold', True)),
-        "subscript": (r"__(?:.*?)__", lambda run: setattr(run.font, 'subscript', True)),
-        "italic": (r"_(?:.*?)_", lambda run: setattr(run, 'italic', True)),
-        "superscript": (r"\^(?:.*?)\^", lambda run: setattr(run.font, 'superscript', True))
+        "bold": r"\*\*(?:.*?)\*\*",
+        "subscript": r"__(?:.*?)__",
+        "italic": r"_(?:.*?)_",
+        "superscript": r"\^(?:.*?)\^"
+    }
+    
+    # Padrões compilados uma única vez e compartilhados por todas as instâncias
+    COMPILED_PATTERN = re.compile("|".join(f"({pattern})" for pattern in PATTERNS.values()))
+    LIST_MARKER_PATTERN = re.compile(r"^\*\s*\\?-")
+    # Caracteres que o Word representa como elementos próprios no run
+    RUN_SPECIAL_CHARS = re.compile(r"([\t\r\n])")
+    
+    # Grupo do regex -> (tamanho do delimitador, propriedade w:rPr, valor)
+    FORMATACOES = {
+        1: (2, "w:b", None),                 # **negrito**
+        2: (2, "w:vertAlign", "subscript"),  # __subscrito__
+        3: (1, "w:i", None),                 # _itálico_
+        4: (1, "w:vertAlign", "superscript") # ^sobrescrito^
     }
     
     def __init__(self, doc):
         """Inicializa o formatador de parágrafos."""
         self.doc = doc
-        self._compile_patterns()
-    
-    def _compile_patterns(self):
-        """Compila todos os padrões de regex em um único padrão."""
-        patterns = [f"({pattern})" for pattern, _ in self.PATTERNS.values()]
-        self.compiled_pattern = re.compile("|".join(patterns))
+        self.compiled_pattern = self.COMPILED_PATTERN
     
     def adicionar_paragrafo_formatado(self, texto: str) -> Any:
         """
@@ -146,11 +171,17 @@ class ParagraphFormatter:
     def _extrair_conteudo(self, texto: str) -> str:
         """Extrai o conteúdo limpo do texto."""
         if self._eh_lista_marcador(texto):
-            return re.sub(r"^\*\s*\\?-", "", texto).strip()
+            return self.LIST_MARKER_PATTERN.sub("", texto).strip()
         return texto
     
     def _aplicar_formatacao(self, par: Any, texto: str):
-        """Aplica formatação ao parágrafo baseado nos padrões."""
+        """
+        Aplica formatação ao parágrafo baseado nos padrões.
+        
+        Os runs são montados como elementos XML e anexados ao parágrafo
+        de uma só vez, em vez de um add_run por trecho.
+        """
+        runs = []
         last_index = 0
         
         for match in self.compiled_pattern.finditer(texto):
@@ -158,32 +189,59 @@ class ParagraphFormatter:
             
             # Adiciona texto normal antes do match
             if start > last_index:
-                par.add_run(texto[last_index:start])
+                runs.append(self._criar_run(texto[last_index:start]))
             
             # Aplica formatação específica
-            self._processar_match(par, match)
+            runs.append(self._processar_match(match))
             last_index = end
         
         # Adiciona texto restante
         if last_index < len(texto):
-            par.add_run(texto[last_index:])
-    
-    def _processar_match(self, par: Any, match: re.Match):
-        """Processa um match de formatação e aplica o estilo apropriado."""
-        # Mapeia grupos do regex para formatações
-        formatacoes = {
-            (1, lambda r: setattr(r, 'bold', True)),           # **negrito**
-            (2, lambda r: setattr(r.font, 'subscript', True)), # __subscrito__
-            (3, lambda r: setattr(r, 'italic', True)),         # _itálico_
-            (4, lambda r: setattr(r.font, 'superscript', True)) # ^sobrescrito^
-        }
-        
-        for grupo, aplicar_formato in formatacoes:
-            if match.group(grupo):
-                texto = re.sub(r"(^\*\*|\*\*$|^__|__$|^_|_$|^\^|\^$)", "", match.group(grupo))
-                run = par.add_run(texto)
-                aplicar_formato(run)
-                break
+            runs.append(self._criar_run(texto[last_index:]))
+        
+        par._p.extend(runs)
+    
+    def _processar_match(self, match: re.Match) -> OxmlElement:
+        """Cria o run formatado correspondente a um match."""
+        # Cada alternativa do regex tem um único grupo de captura, então
+        # lastindex identifica diretamente qual formatação casou
+        grupo = match.lastindex
+        tamanho, propriedade, valor = self.FORMATACOES[grupo]
+        
+        # Remove os delimitadores, cujo tamanho é conhecido pelo grupo
+        return self._criar_run(match.group(grupo)[tamanho:-tamanho], propriedade, valor)
+    
+    def _criar_run(self, texto: str, propriedade: Optional[str] = None,
+                   valor: Optional[str] = None) -> OxmlElement:
+        """
+        Cria um elemento w:r com o texto e, opcionalmente, uma propriedade.
+        
+        Tabulações e quebras de linha viram w:tab e w:br, como no add_run.
+        """
+        run = OxmlElement("w:r")
+        
+        if propriedade:
+            rPr = OxmlElement("w:rPr")
+            prop = OxmlElement(propriedade)
+            if valor:
+                prop.set(_QN_VAL, valor)
+            rPr.append(prop)
+            run.append(rPr)
+        
+        for parte in self.RUN_SPECIAL_CHARS.split(texto):
+            if not parte:
+                continue
+            if parte == "\t":
+                run.append(OxmlElement("w:tab"))
+            elif parte in ("\r", "\n"):
+                run.append(OxmlElement("w:br"))
+            else:
+                t = OxmlElement("w:t")
+                t.text = parte
+                t.set(_QN_XML_SPACE, "preserve")
+                run.append(t)
+        
+        return run
 
 
 # Funções de conveniência para manter compatibilidade
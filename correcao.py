@@ -3,10 +3,12 @@ Módulo para correção e normalização de dados das provas do ENEM.
 Processa arquivos CSV ajustando valores de dificuldade (NU_PARAM_B).
 """
 
+import numpy as np
 import pandas as pd
 import os
-from typing import List, Union, Optional
+from typing import List, Optional
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 
@@ -17,18 +19,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Regras de ajuste de NU_PARAM_B:
+#   LIMITE_GRANDE < |valor| < LIMITE_MAXIMO: valor + DESLOCAMENTO
+#   |valor| < LIMITE_PEQUENO: valor * ESCALA + DESLOCAMENTO
+#   outros casos (e ausentes): 0
+_LIMITE_GRANDE = 1000
+_LIMITE_MAXIMO = 100000
+_LIMITE_PEQUENO = 10
+_ESCALA = 100
+_DESLOCAMENTO = 500
+
 
 class ENEMDataProcessor:
     """Classe para processar e corrigir dados das provas do ENEM."""
     
-    # Constantes para ajuste de notas
-    ADJUSTMENT_RULES = {
-        'large_positive': (1000, 100000, 500),     # valor > 1000 e < 100000: +500
-        'large_negative': (-100000, -1000, 500),   # valor > -100000 e < -1000: +500
-        'small_range': (-10, 10, 100, 500),        # -10 < valor < 10: *100 + 500
-        'default': 0                                # outros casos: 0
-    }
-    
     DEFAULT_ENCODING = "latin1"
     DEFAULT_SEPARATOR = ";"
     DECIMAL_SEPARATOR = "."
@@ -43,30 +47,61 @@ class ENEMDataProcessor:
         """
         self.base_path = Path(base_path)
         self._validate_path()
+        
+        # Caminhos dos arquivos anuais, montados uma única vez
+        self._arquivos = {
+            ano: self.base_path / f"ITENS_PROVA_{ano}.csv"
+            for ano in range(2009, 2025)
+        }
     
     def _validate_path(self):
         """Valida se o caminho base existe."""
         if not self.base_path.exists():
             raise FileNotFoundError(f"Diretório não encontrado: {self.base_path}")
     
-    def processar_anos(self, anos: Optional[List[int]] = None):
+    def _arquivo_ano(self, ano: int) -> Path:
+        """Retorna o caminho do arquivo CSV de um ano."""
+        arquivo = self._arquivos.get(ano)
+        if arquivo is None:
+            arquivo = self.base_path / f"ITENS_PROVA_{ano}.csv"
+        return arquivo
+    
+    def processar_anos(self, anos: Optional[List[int]] = None,
+                       max_workers: Optional[int] = None):
         """
         Processa dados de múltiplos anos.
         
+        Cada ano é um arquivo independente, então os anos são processados
+        em paralelo, um por processo.
+        
         Args:
             anos: Lista de anos a processar. Se None, usa anos padrão (2009-2024)
+            max_workers: Número de processos. Se None, usa um por ano até o
+                número de CPUs
         """
         if anos is None:
             anos = list(range(2009, 2025))
         
-        resultados = []
-        for ano in anos:
-            try:
-                sucesso = self.processar_ano(ano)
-                resultados.append((ano, sucesso))
-            except Exception as e:
-                logger.error(f"Erro ao processar ano {ano}: {e}")
-                resultados.append((ano, False))
+        if max_workers is None:
+            max_workers = min(len(anos), os.cpu_count() or 1)
+        
+        sucessos = {}
+        if anos:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futuros = {
+                    executor.submit(_processar_ano_isolado, str(self.base_path), ano): ano
+                    for ano in anos
+                }
+                for futuro in as_completed(futuros):
+                    ano = futuros[futuro]
+                    try:
+                        sucessos[ano] = futuro.result()
+                    except Exception as e:
+                        logger.error(f"Erro ao processar ano {ano}: {e}")
+                        sucessos[ano] = False
+        
+        # Mantém a ordem dos anos solicitados no relatório
+        resultados = [(ano, sucessos[ano]) for ano in anos]
         
         self._relatorio_processamento(resultados)
         return resultados
@@ -81,11 +116,7 @@ class ENEMDataProcessor:
         Returns:
             True se processado com sucesso, False caso contrário
         """
-        arquivo_csv = self.base_path / f"ITENS_PROVA_{ano}.csv"
-        
-        if not arquivo_csv.exists():
-            logger.warning(f"Arquivo não encontrado: {arquivo_csv}")
-            return False
+        arquivo_csv = self._arquivo_ano(ano)
         
         try:
             # Carrega e processa o DataFrame
@@ -96,17 +127,36 @@ class ENEMDataProcessor:
             logger.info(f"Arquivo {ano} atualizado com sucesso!")
             return True
             
+        except FileNotFoundError:
+            logger.warning(f"Arquivo não encontrado: {arquivo_csv}")
+            return False
         except Exception as e:
             logger.error(f"Erro ao processar arquivo {ano}: {e}")
             return False
     
-    def _carregar_dataframe(self, arquivo: Path) -> pd.DataFrame:
-        """Carrega DataFrame do arquivo CSV."""
+    def _carregar_dataframe(self, arquivo: Path, 
+                            decimal: Optional[str] = None,
+                            colunas: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Carrega DataFrame do arquivo CSV.
+        
+        Args:
+            arquivo: Caminho do arquivo
+            decimal: Separador decimal. Se None, usa DECIMAL_SEPARATOR
+            colunas: Colunas a carregar (as ausentes são ignoradas). Se None,
+                carrega todas
+        """
+        usecols = None
+        if colunas is not None:
+            usecols = lambda coluna: coluna in colunas
+        
         return pd.read_csv(
             arquivo,
             sep=self.DEFAULT_SEPARATOR,
             encoding=self.DEFAULT_ENCODING,
-            decimal=self.DECIMAL_SEPARATOR
+            decimal=decimal or self.DECIMAL_SEPARATOR,
+            usecols=usecols,
+            dtype={"TX_COR": "category"}
         )
     
     def _processar_dataframe(self, df: pd.DataFrame, ano: int) -> pd.DataFrame:
@@ -134,7 +184,12 @@ class ENEMDataProcessor:
             logger.warning("Coluna TX_COR não encontrada no DataFrame")
             return df
         
-        return df[df["TX_COR"].str.upper() == "AZUL"].copy()
+        # Compara só as categorias (poucas), não cada linha em texto
+        cores = df["TX_COR"].astype("category")
+        categorias = cores.cat.categories
+        azuis = categorias[categorias.str.upper() == "AZUL"]
+        
+        return df[cores.isin(azuis)]
     
     def _processar_coluna_param_b(self, df: pd.DataFrame, ano: int) -> pd.DataFrame:
         """Processa a coluna NU_PARAM_B com conversões e ajustes."""
@@ -142,88 +197,59 @@ class ENEMDataProcessor:
             logger.warning("Coluna NU_PARAM_B não encontrada no DataFrame")
             return df
         
-        # Converte para float
-        df["NU_PARAM_B"] = self._converter_para_float(df["NU_PARAM_B"])
-        
-        # Aplica ajustes
-        df["NU_PARAM_B"] = df["NU_PARAM_B"].apply(
-            lambda x: self._ajustar_nota(x, ano)
-        )
-        
-        # Converte de volta para formato brasileiro
-        df["NU_PARAM_B"] = self._formatar_decimal_brasileiro(df["NU_PARAM_B"])
-        
-        return df
+        # Converte para float e aplica ajustes; assign devolve um novo
+        # DataFrame, sem escrever no recorte do caderno azul
+        notas = self._ajustar_notas(self._converter_para_float(df["NU_PARAM_B"]))
+        return df.assign(NU_PARAM_B=notas)
     
     def _converter_para_float(self, series: pd.Series) -> pd.Series:
         """Converte série para float, tratando vírgulas."""
-        return (
-            series
-            .astype(str)
-            .str.replace(",", ".", regex=False)
-            .apply(pd.to_numeric, errors='coerce')
+        # Coluna já numérica (lida direto pelo parser): nada a converter
+        if series.dtype.kind in "iuf":
+            return series.astype("float64")
+        
+        return pd.to_numeric(
+            series.str.replace(",", ".", regex=False),
+            errors='coerce'
         )
     
-    def _ajustar_nota(self, valor: Union[float, None], ano: int) -> str:
+    def _ajustar_notas(self, series: pd.Series) -> pd.Series:
         """
-        Aplica regras de ajuste à nota.
+        Aplica as regras de ajuste a toda a série de uma só vez.
         
-        Args:
-            valor: Valor a ajustar
-            ano: Ano do arquivo (para logging de erros)
-            
-        Returns:
-            Valor ajustado formatado como string
-        """
-        try:
-            if pd.isna(valor):
-                return "0.00"
-            
-            # Aplica regras de ajuste
-            nota = self._calcular_ajuste(valor)
-            return f"{nota:.2f}"
-            
-        except (ValueError, TypeError) as e:
-            logger.error(f"[ERRO] Ano {ano} | Valor inválido: {valor} | Erro: {e}")
-            return "0.00"
-    
-    def _calcular_ajuste(self, valor: float) -> float:
-        """
-        Calcula o ajuste baseado nas regras definidas.
+        Valores ausentes ou fora das faixas previstas viram 0.
         
         Args:
-            valor: Valor original
+            series: Série numérica com os valores originais
             
         Returns:
-            Valor ajustado
+            Série float com os valores ajustados (duas casas decimais)
         """
-        # Verifica grandes valores positivos ou negativos
-        if (1000 < valor < 100000) or (-100000 < valor < -1000):
-            return valor + 500
+        valores = series.to_numpy(dtype="float64")
         
-        # Verifica pequenos valores
-        elif -10 < valor < 10:
-            return (valor * 100) + 500
+        # Comparações com NaN são falsas, então ausentes caem no padrão (0)
+        grandes = np.logical_or(
+            np.logical_and(valores > _LIMITE_GRANDE, valores < _LIMITE_MAXIMO),
+            np.logical_and(valores > -_LIMITE_MAXIMO, valores < -_LIMITE_GRANDE)
+        )
+        pequenos = np.logical_and(valores > -_LIMITE_PEQUENO, valores < _LIMITE_PEQUENO)
         
-        # Caso padrão
-        else:
-            return 0
-    
-    def _formatar_decimal_brasileiro(self, series: pd.Series) -> pd.Series:
-        """Formata série para padrão decimal brasileiro (vírgula)."""
-        return (
-            series
-            .astype(str)
-            .str.replace(".", ",", regex=False)
+        ajustados = np.select(
+            [grandes, pequenos],
+            [valores + _DESLOCAMENTO, valores * _ESCALA + _DESLOCAMENTO],
+            default=0.0
         )
+        
+        return pd.Series(np.round(ajustados, 2), index=series.index)
     
     def _salvar_dataframe(self, df: pd.DataFrame, arquivo: Path):
-        """Salva DataFrame no arquivo CSV."""
+        """Salva DataFrame no arquivo CSV com decimal brasileiro (vírgula)."""
         df.to_csv(
             arquivo,
             sep=self.DEFAULT_SEPARATOR,
             index=False,
-            encoding=self.DEFAULT_ENCODING
+            encoding=self.DEFAULT_ENCODING,
+            decimal=self.OUTPUT_DECIMAL
         )
     
     def _relatorio_processamento(self, resultados: List[tuple]):
@@ -233,9 +259,14 @@ class ENEMDataProcessor:
         Args:
             resultados: Lista de tuplas (ano, sucesso)
         """
+        # Separa os anos em uma única passada
+        anos_ok, anos_falha = [], []
+        for ano, sucesso in resultados:
+            (anos_ok if sucesso else anos_falha).append(ano)
+        
         total = len(resultados)
-        sucessos = sum(1 for _, sucesso in resultados if sucesso)
-        falhas = total - sucessos
+        sucessos = len(anos_ok)
+        falhas = len(anos_falha)
         
         logger.info("=" * 50)
         logger.info(f"RELATÓRIO DE PROCESSAMENTO")
@@ -244,7 +275,6 @@ class ENEMDataProcessor:
         logger.info(f"Falhas: {falhas}")
         
         if falhas > 0:
-            anos_falha = [ano for ano, sucesso in resultados if not sucesso]
             logger.warning(f"Anos com falha: {anos_falha}")
         
         logger.info("=" * 50)
@@ -259,36 +289,46 @@ class ENEMDataProcessor:
         Returns:
             True se válido, False caso contrário
         """
-        arquivo_csv = self.base_path / f"ITENS_PROVA_{ano}.csv"
-        
-        if not arquivo_csv.exists():
-            return False
+        arquivo_csv = self._arquivo_ano(ano)
         
         try:
-            df = self._carregar_dataframe(arquivo_csv)
+            # Só as duas colunas verificadas são carregadas
+            df = self._carregar_dataframe(
+                arquivo_csv,
+                decimal=self.OUTPUT_DECIMAL,
+                colunas=["TX_COR", "NU_PARAM_B"]
+            )
             
-            # Verifica se há apenas caderno azul
+            # Verifica se há apenas caderno azul (olhando só as categorias)
             if "TX_COR" in df.columns:
-                cores_unicas = df["TX_COR"].str.upper().unique()
-                if len(cores_unicas) != 1 or cores_unicas[0] != "AZUL":
+                cores = df["TX_COR"].astype("category").cat.remove_unused_categories()
+                cores_unicas = cores.cat.categories.str.upper().unique()
+                if cores.isna().any() or list(cores_unicas) != ["AZUL"]:
                     logger.warning(f"Ano {ano}: Encontradas cores além de AZUL")
                     return False
             
             # Verifica formato dos valores
             if "NU_PARAM_B" in df.columns:
-                # Verifica se usa vírgula como separador decimal
-                valores_com_ponto = df["NU_PARAM_B"].str.contains(".", regex=False).any()
-                if valores_com_ponto:
+                # Lido com vírgula decimal, a coluna só é float se nenhum
+                # valor usar ponto
+                if df["NU_PARAM_B"].dtype.kind != 'f':
                     logger.warning(f"Ano {ano}: Valores com ponto decimal encontrados")
                     return False
             
             return True
             
+        except FileNotFoundError:
+            return False
         except Exception as e:
             logger.error(f"Erro ao validar ano {ano}: {e}")
             return False
 
 
+def _processar_ano_isolado(base_path: str, ano: int) -> bool:
+    """Processa um ano em um processo de trabalho (precisa ser serializável)."""
+    return ENEMDataProcessor(base_path).processar_ano(ano)
+
+
 def main():
     """Função principal para execução do script."""
     # Define anos a processar
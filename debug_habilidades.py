@@ -1,7 +1,33 @@
+import os
+
 import pandas as pd
 
-# Carrega o CSV consolidado
-df = pd.read_csv('base-de-dados-CSV/ITENS_PROVA_CONSOLIDADO.csv', sep=';', encoding='utf-8', decimal=',')
+try:
+    import pyarrow.dataset as ds
+except ImportError:
+    ds = None
+
+ARQUIVO_CSV = 'base-de-dados-CSV/ITENS_PROVA_CONSOLIDADO.csv'
+ARQUIVO_PARQUET = 'base-de-dados-CSV/ITENS_PROVA_CONSOLIDADO.parquet'
+COLUNAS = ['SG_AREA', 'CO_HABILIDADE', 'ANO_PROVA', 'CO_POSICAO', 'TX_GABARITO']
+
+if ds is not None and os.path.exists(ARQUIVO_PARQUET):
+    # Lê do Parquet só as colunas usadas e só as linhas de Matemática
+    tabela = ds.dataset(ARQUIVO_PARQUET, format='parquet').to_table(
+        columns=COLUNAS,
+        filter=ds.field('SG_AREA') == 'MT'
+    )
+    df = tabela.to_pandas()
+else:
+    # Carrega o CSV consolidado (apenas as colunas usadas abaixo)
+    df = pd.read_csv(
+        ARQUIVO_CSV,
+        sep=';',
+        encoding='utf-8',
+        decimal=',',
+        usecols=COLUNAS,
+        dtype={'SG_AREA': 'category'}
+    )
 
 # Filtra por Matemática
 df_mt = df[df['SG_AREA'] == 'MT'].copy()
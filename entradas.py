@@ -4,107 +4,65 @@ Gerencia a seleção de parâmetros para geração de compilados de questões do
 """
 
 import streamlit as st
-from typing import List, Tuple, Optional, Dict, Set
-from dataclasses import dataclass
-from enum import Enum
+from typing import List, Tuple, Optional, Dict, FrozenSet
+from functools import lru_cache
 
+# Definições puras ficam em filtros.py; Materia e FiltrosQuestoes continuam
+# importáveis daqui
+from filtros import (
+    ANOS_DISPONIVEIS, Materia, FiltrosQuestoes,
+    MATERIA_ITEMS, MATERIA_CODIGOS,
+    separar_habilidades, separar_numeros,
+)
 
-class Materia(Enum):
-    """Enumeração das matérias disponíveis no ENEM."""
-    MATEMATICA = ("MT", "Matemática", "mat")
-    LINGUAGENS = ("LC", "Linguagens", "ling")
-    HUMANAS = ("CH", "Ciências Humanas", "hum")
-    NATUREZA = ("CN", "Ciências da Natureza", "nat")
-    
-    @property
-    def codigo(self) -> str:
-        """Retorna o código da matéria."""
-        return self.value[0]
-    
-    @property
-    def nome(self) -> str:
-        """Retorna o nome completo da matéria."""
-        return self.value[1]
-    
-    @property
-    def checkbox_id(self) -> str:
-        """Retorna o ID para checkbox."""
-        return self.value[2]
 
-
-@dataclass
-class FiltrosQuestoes:
-    """Classe para armazenar os filtros selecionados pelo usuário."""
-    anos: List[str]  # Agora suporta múltiplos anos
-    materias: List[str]
-    numeros_questoes: Optional[List[int]]
-    dificuldade_minima: int
-    dificuldade_maxima: int
-    filtrar_por_numero: bool
-    filtrar_por_dificuldade: bool
-    filtrar_por_quantidade: bool
-    quantidade_questoes: Optional[int]
-    filtrar_por_habilidade: bool
-    habilidades: Optional[List[int]]
-    
-    def validar(self) -> Tuple[bool, Optional[str]]:
-        """
-        Valida os filtros selecionados.
-        
-        Returns:
-            Tupla (válido, mensagem_erro)
-        """
-        # Verifica se pelo menos um ano foi selecionado
-        if not self.anos:
-            return False, "Selecione pelo menos um ano"
-        
-        # Verifica se pelo menos uma matéria foi selecionada
-        if not self.materias:
-            return False, "Selecione pelo menos uma matéria"
-        
-        # Valida intervalo de dificuldade
-        if self.filtrar_por_dificuldade:
-            if self.dificuldade_minima > self.dificuldade_maxima:
-                return False, "Dificuldade mínima não pode ser maior que a máxima"
-        
-        # Valida números das questões
-        if self.filtrar_por_numero and not self.numeros_questoes:
-            return False, "Digite os números das questões ou desmarque o filtro"
-        
-        # Valida quantidade de questões
-        if self.filtrar_por_quantidade:
-            if not self.quantidade_questoes or self.quantidade_questoes <= 0:
-                return False, "A quantidade de questões deve ser maior que zero"
-        
-        # Valida habilidades
-        if self.filtrar_por_habilidade and not self.habilidades:
-            return False, "Digite as habilidades desejadas ou desmarque o filtro"
-        
-        # Verifica conflito entre filtros
-        if self.filtrar_por_numero and self.filtrar_por_quantidade:
-            return False, "Não é possível usar 'Selecionar por número' e 'Limitar quantidade' ao mesmo tempo"
-        
-        # Aviso quando múltiplos anos com números específicos
-        if self.filtrar_por_numero and len(self.anos) > 1:
-            # Não é erro, mas vale um aviso (será tratado na interface)
-            pass
-        
-        return True, None
+# Textos fixos de ajuda da interface
+_HAB_HINT = (
+    "💡 Cada matéria tem suas próprias habilidades (H1-H30). "
+    "Ex: H21 de Matemática é diferente de H21 de Linguagens."
+)
 
 
 class InterfaceEntradas:
     """Classe para gerenciar a interface de entrada de dados."""
     
     # Constantes de configuração
-    ANOS_DISPONIVEIS = [str(ano) for ano in range(2009, 2024)]
+    ANOS_DISPONIVEIS = ANOS_DISPONIVEIS
+    
+    # Seleções rápidas de anos, calculadas uma única vez
+    _ULTIMOS_5 = tuple(ANOS_DISPONIVEIS[-5:])
+    _ULTIMOS_3 = tuple(ANOS_DISPONIVEIS[-3:])
+    _TODOS = tuple(ANOS_DISPONIVEIS)
     DIFICULDADE_MIN = 1
     DIFICULDADE_MAX = 2000
     DIFICULDADE_DEFAULT_MIN = 1
     DIFICULDADE_DEFAULT_MAX = 2000
+    
+    # Nível de dificuldade de cada valor do slider, indexado pelo próprio valor
+    _NIVEIS = tuple(
+        "Fácil" if v <= 400 else "Médio" if v <= 800 else "Difícil"
+        for v in range(DIFICULDADE_MAX + 1)
+    )
     QUANTIDADE_MIN = 1
     QUANTIDADE_MAX = 500  # Aumentado para suportar múltiplos anos
     QUANTIDADE_DEFAULT = 25
     
+    # Chaves do session_state onde cada aba de filtros guarda seus valores
+    _CHAVES_FILTROS = ("_filtro_numero", "_filtro_quantidade", "_filtro_dificuldade", "_filtro_habilidade")
+    
+    # Valores dos filtros adicionais quando nenhum está ativo
+    _FILTROS_PADRAO = {
+        'por_numero': False,
+        'por_quantidade': False,
+        'por_dificuldade': False,
+        'por_habilidade': False,
+        'numeros': None,
+        'quantidade': None,
+        'dif_min': DIFICULDADE_DEFAULT_MIN,
+        'dif_max': DIFICULDADE_DEFAULT_MAX,
+        'habilidades': None
+    }
+    
     # Habilidades do ENEM por área
     HABILIDADES_POR_AREA = {
         "MT": list(range(1, 31)),  # H1 a H30
@@ -113,10 +71,6 @@ class InterfaceEntradas:
         "CN": list(range(1, 31)),  # H1 a H30
     }
     
-    def __init__(self):
-        """Inicializa a interface de entradas."""
-        self.materias_map = {m.checkbox_id: m for m in Materia}
-    
     def renderizar(self) -> FiltrosQuestoes:
         """
         Renderiza a interface e retorna os filtros selecionados.
@@ -124,23 +78,33 @@ class InterfaceEntradas:
         Returns:
             Objeto FiltrosQuestoes com as seleções do usuário
         """
-        # Seleção de anos (múltiplos)
-        anos = self._renderizar_selecao_anos()
+        # Seleção de anos (múltiplos); as escritas no session_state ficam
+        # pendentes e são aplicadas de uma só vez no final
+        anos, pendentes = self._renderizar_selecao_anos()
         
         # Seleção de matérias
         materias = self._renderizar_selecao_materias()
         
-        # Título da seção de filtros
-        st.title("Seleção de Questões")
+        if anos and materias:
+            # Título da seção de filtros
+            st.title("Seleção de Questões")
+            
+            # Filtros adicionais
+            filtros = self._renderizar_filtros_adicionais(anos, materias)
+        else:
+            # Sem anos ou matérias a validação falharia de qualquer forma:
+            # não vale renderizar as abas de filtros
+            st.info("Selecione anos e matérias para prosseguir")
+            filtros = self._FILTROS_PADRAO
         
-        # Filtros adicionais
-        filtros = self._renderizar_filtros_adicionais(anos, materias)
+        st.session_state.update(pendentes)
         
         # Cria e retorna objeto com todos os filtros
+        numeros = filtros['numeros']
         return FiltrosQuestoes(
-            anos=anos,
-            materias=materias,
-            numeros_questoes=filtros['numeros'],
+            anos=tuple(anos),
+            materias=tuple(materias),
+            numeros_questoes=tuple(numeros) if numeros is not None else None,
             dificuldade_minima=filtros['dif_min'],
             dificuldade_maxima=filtros['dif_max'],
             filtrar_por_numero=filtros['por_numero'],
@@ -151,47 +115,83 @@ class InterfaceEntradas:
             habilidades=filtros['habilidades']
         )
     
-    def _renderizar_selecao_anos(self) -> List[str]:
-        """Renderiza seleção de anos das provas (múltiplos)."""
+    def _renderizar_selecao_anos(self) -> Tuple[List[str], Dict]:
+        """
+        Renderiza seleção de anos das provas (múltiplos).
+        
+        Returns:
+            Tupla (anos selecionados, atualizações pendentes do session_state)
+        """
         st.subheader("📅 Anos das Provas")
         
         if "anos_selecionados" not in st.session_state:
             st.session_state.anos_selecionados = [self.ANOS_DISPONIVEIS[-1]]
+        
+        # O valor do multiselect vive na sua chave; definido aqui em vez de
+        # default= para que os callbacks possam alterá-lo
+        if "multiselect_anos" not in st.session_state:
+            st.session_state.multiselect_anos = list(st.session_state.anos_selecionados)
             
-        col1, col2, col3 = st.columns(3)
+        pendentes = {}
+        col1, col2 = st.columns([2, 1])
         
         with col1:
             # Multiselect para escolher vários anos
             anos_selecionados = st.multiselect(
                 "Selecione os anos desejados",
                 self.ANOS_DISPONIVEIS,
-                default=st.session_state.anos_selecionados,
                 help="Você pode selecionar múltiplos anos para compilar questões",
                 key="multiselect_anos"
             )
             
             # Atualiza session_state com a seleção manual
             if anos_selecionados != st.session_state.anos_selecionados:
-                st.session_state.anos_selecionados = anos_selecionados
+                pendentes["anos_selecionados"] = anos_selecionados
         
         with col2:
             st.write("Seleção rápida:")
-            if st.button("Últimos 5 anos", use_container_width=True):
-                st.session_state.anos_selecionados = self.ANOS_DISPONIVEIS[-5:]
-                st.rerun()
-                
-            if st.button("Últimos 3 anos", use_container_width=True):
-                st.session_state.anos_selecionados = self.ANOS_DISPONIVEIS[-3:]
-                st.rerun()
-                
-            if st.button("Todos os anos", use_container_width=True):
-                st.session_state.anos_selecionados = self.ANOS_DISPONIVEIS
-                st.rerun()
+            # Os callbacks rodam antes do próximo rerun, sem precisar de st.rerun()
+            st.button("Últimos 5 anos", on_click=self._definir_anos,
+                      args=(self._ULTIMOS_5,), use_container_width=True)
+            st.button("Últimos 3 anos", on_click=self._definir_anos,
+                      args=(self._ULTIMOS_3,), use_container_width=True)
+            st.button("Todos os anos", on_click=self._definir_anos,
+                      args=(self._TODOS,), use_container_width=True)
         
         if anos_selecionados:
-            st.info(f"📊 {len(anos_selecionados)} ano(s) selecionado(s): {', '.join(sorted(anos_selecionados))}")
+            st.info(self._texto_memoizado(
+                "_anos_info",
+                tuple(sorted(anos_selecionados)),
+                lambda anos: f"📊 {len(anos)} ano(s) selecionado(s): {', '.join(anos)}",
+                pendentes
+            ))
+        
+        return anos_selecionados, pendentes
+    
+    def _definir_anos(self, anos: Tuple[str, ...]):
+        """Callback das seleções rápidas: atualiza os anos antes do multiselect ser criado."""
+        st.session_state.anos_selecionados = list(anos)
+        st.session_state.multiselect_anos = list(anos)
+    
+    def _texto_memoizado(self, nome: str, chave: Tuple, formatar, pendentes: Dict) -> str:
+        """
+        Retorna um texto guardado no session_state, refeito só quando a chave muda.
         
-        return anos_selecionados
+        Args:
+            nome: Nome da entrada no session_state
+            chave: Valores dos quais o texto depende
+            formatar: Função que monta o texto a partir da chave
+            pendentes: Atualizações do session_state a aplicar pelo chamador
+        """
+        memo = st.session_state.get(nome)
+        if memo is None or memo[0] != chave:
+            memo = (chave, formatar(chave))
+            pendentes[nome] = memo
+        return memo[1]
+    
+    def _definir_estado(self, chave: str, valor):
+        """Callback genérico: define o valor de um widget pelo session_state."""
+        st.session_state[chave] = valor
     
     def _renderizar_selecao_materias(self) -> List[str]:
         """
@@ -202,31 +202,19 @@ class InterfaceEntradas:
         """
         st.subheader("📚 Matérias")
         
-        col1, col2, col3 = st.columns(3)
+        # Uma coluna por matéria e uma para os botões de ação
+        cols = st.columns(5)
         
         materias_selecionadas = []
         
-        with col1:
-            col1_inner1, col1_inner2 = st.columns(2)
-            with col1_inner1:
-                if st.checkbox(Materia.MATEMATICA.nome, key=Materia.MATEMATICA.checkbox_id):
-                    materias_selecionadas.append(Materia.MATEMATICA.codigo)
-            with col1_inner2:
-                if st.checkbox(Materia.LINGUAGENS.nome, key=Materia.LINGUAGENS.checkbox_id):
-                    materias_selecionadas.append(Materia.LINGUAGENS.codigo)
-        
-        with col2:
-            col2_inner1, col2_inner2 = st.columns(2)
-            with col2_inner1:
-                if st.checkbox(Materia.HUMANAS.nome, key=Materia.HUMANAS.checkbox_id):
-                    materias_selecionadas.append(Materia.HUMANAS.codigo)
-            with col2_inner2:
-                if st.checkbox(Materia.NATUREZA.nome, key=Materia.NATUREZA.checkbox_id):
-                    materias_selecionadas.append(Materia.NATUREZA.codigo)
+        for col, (nome, codigo, checkbox_id) in zip(cols, MATERIA_ITEMS):
+            with col:
+                if st.checkbox(nome, key=checkbox_id):
+                    materias_selecionadas.append(codigo)
         
-        with col3:
+        with cols[4]:
             if st.button("Selecionar todas", use_container_width=False):
-                materias_selecionadas = [m.codigo for m in Materia]
+                materias_selecionadas = list(MATERIA_CODIGOS)
             if st.button("Limpar seleção", use_container_width=False):
                 materias_selecionadas = []
         
@@ -237,6 +225,10 @@ class InterfaceEntradas:
         """
         Renderiza filtros adicionais.
         
+        Cada aba é um fragmento: interagir com os widgets de uma aba reexecuta
+        apenas ela. Os valores de cada aba ficam em st.session_state e são
+        reunidos aqui.
+        
         Returns:
             Dicionário com os valores dos filtros
         """
@@ -250,66 +242,95 @@ class InterfaceEntradas:
             "🎓 Por Habilidade"
         ])
         
-        filtros_ativos = {
-            'por_numero': False,
-            'por_quantidade': False,
-            'por_dificuldade': False,
-            'por_habilidade': False,
-            'numeros': None,
-            'quantidade': None,
-            'dif_min': self.DIFICULDADE_DEFAULT_MIN,
-            'dif_max': self.DIFICULDADE_DEFAULT_MAX,
-            'habilidades': None
-        }
-        
         with tab1:
-            filtros_ativos['por_numero'] = st.checkbox(
-                "Ativar filtro por número",
-                help="Seleciona questões específicas pelo número"
-            )
-            
-            if filtros_ativos['por_numero']:
-                if len(anos_selecionados) > 1:
-                    st.warning("⚠️ Com múltiplos anos, os números de questão se aplicam a todos os anos selecionados")
-                
-                filtros_ativos['numeros'] = self._renderizar_filtro_numeros()
+            self._tab_numero(len(anos_selecionados) > 1)
         
         with tab2:
-            filtros_ativos['por_quantidade'] = st.checkbox(
-                "Ativar limite de quantidade",
-                help="Define número máximo de questões"
-            )
-            
-            if filtros_ativos['por_quantidade']:
-                if filtros_ativos['por_numero']:
-                    st.error("❌ Não é possível usar filtro por número e quantidade simultaneamente")
-                    filtros_ativos['por_quantidade'] = False
-                else:
-                    filtros_ativos['quantidade'] = self._renderizar_filtro_quantidade()
+            self._tab_quantidade()
         
         with tab3:
-            filtros_ativos['por_dificuldade'] = st.checkbox(
-                "Ativar filtro por dificuldade",
-                help="Filtra por intervalo de dificuldade (TRI)"
-            )
-            
-            if filtros_ativos['por_dificuldade']:
-                dif_min, dif_max = self._renderizar_filtro_dificuldade()
-                filtros_ativos['dif_min'] = dif_min
-                filtros_ativos['dif_max'] = dif_max
+            self._tab_dificuldade()
         
         with tab4:
-            filtros_ativos['por_habilidade'] = st.checkbox(
-                "Ativar filtro por habilidade",
-                help="Seleciona questões de habilidades específicas"
-            )
-            
-            if filtros_ativos['por_habilidade']:
-                filtros_ativos['habilidades'] = self._renderizar_filtro_habilidades(materias_selecionadas)
+            self._tab_habilidade(materias_selecionadas)
+        
+        filtros_ativos = dict(self._FILTROS_PADRAO)
+        for chave in self._CHAVES_FILTROS:
+            filtros_ativos.update(st.session_state.get(chave, {}))
         
         return filtros_ativos
     
-    def _renderizar_filtro_habilidades(self, materias_selecionadas: List[str]) -> Optional[List[int]]:
+    @st.fragment
+    def _tab_numero(self, multiplos_anos: bool):
+        """Aba de filtro por número da questão."""
+        por_numero = st.checkbox(
+            "Ativar filtro por número",
+            help="Seleciona questões específicas pelo número"
+        )
+        
+        numeros = None
+        if por_numero:
+            if multiplos_anos:
+                st.warning("⚠️ Com múltiplos anos, os números de questão se aplicam a todos os anos selecionados")
+            
+            numeros = self._renderizar_filtro_numeros()
+        
+        st.session_state["_filtro_numero"] = {'por_numero': por_numero, 'numeros': numeros}
+    
+    @st.fragment
+    def _tab_quantidade(self):
+        """Aba de limite de quantidade de questões."""
+        por_quantidade = st.checkbox(
+            "Ativar limite de quantidade",
+            help="Define número máximo de questões"
+        )
+        
+        quantidade = None
+        if por_quantidade:
+            if st.session_state.get("_filtro_numero", {}).get('por_numero'):
+                st.error("❌ Não é possível usar filtro por número e quantidade simultaneamente")
+                por_quantidade = False
+            else:
+                quantidade = self._renderizar_filtro_quantidade()
+        
+        st.session_state["_filtro_quantidade"] = {
+            'por_quantidade': por_quantidade,
+            'quantidade': quantidade
+        }
+    
+    @st.fragment
+    def _tab_dificuldade(self):
+        """Aba de filtro por intervalo de dificuldade."""
+        por_dificuldade = st.checkbox(
+            "Ativar filtro por dificuldade",
+            help="Filtra por intervalo de dificuldade (TRI)"
+        )
+        
+        filtro = {'por_dificuldade': por_dificuldade}
+        if por_dificuldade:
+            filtro['dif_min'], filtro['dif_max'] = self._renderizar_filtro_dificuldade()
+        
+        st.session_state["_filtro_dificuldade"] = filtro
+    
+    @st.fragment
+    def _tab_habilidade(self, materias_selecionadas: List[str]):
+        """Aba de filtro por habilidade."""
+        por_habilidade = st.checkbox(
+            "Ativar filtro por habilidade",
+            help="Seleciona questões de habilidades específicas"
+        )
+        
+        habilidades, pendentes = None, {}
+        if por_habilidade:
+            habilidades, pendentes = self._renderizar_filtro_habilidades(materias_selecionadas)
+        
+        pendentes["_filtro_habilidade"] = {
+            'por_habilidade': por_habilidade,
+            'habilidades': habilidades
+        }
+        st.session_state.update(pendentes)
+    
+    def _renderizar_filtro_habilidades(self, materias_selecionadas: List[str]) -> Tuple[Optional[FrozenSet[int]], Dict]:
         """
         Renderiza seleção de habilidades.
         
@@ -317,49 +338,54 @@ class InterfaceEntradas:
             materias_selecionadas: Lista de matérias selecionadas
             
         Returns:
-            Lista de habilidades selecionadas
+            Tupla (conjunto de habilidades selecionadas, atualizações pendentes do session_state)
         """
+        pendentes = {}
         if not materias_selecionadas:
             st.warning("Selecione pelo menos uma matéria para filtrar por habilidade")
-            return None
+            return None, pendentes
+        
+        if "habilidades_input" not in st.session_state:
+            st.session_state.habilidades_input = ""
         
         col1, col2 = st.columns([2, 1])
         
         with col1:
             # Campo de texto para habilidades
-            st.info(
-                "💡 Cada matéria tem suas próprias habilidades (H1-H30). "
-                "Ex: H21 de Matemática é diferente de H21 de Linguagens."
-                )
+            st.info(_HAB_HINT)
             habilidades_texto = st.text_input(
                 "Habilidades (separadas por espaço ou vírgula)",
                 placeholder="Ex: 21 22 23 ou H21, H22, H23",
-                help="Digite os números das habilidades desejadas"
+                help="Digite os números das habilidades desejadas",
+                key="habilidades_input"
             )
             
         
         with col2:
             st.write("Habilidades comuns:")
-            if st.button("H1-H5", use_container_width=True):
-                habilidades_texto = "1 2 3 4 5"
-            if st.button("H21-H25", use_container_width=True):
-                habilidades_texto = "21 22 23 24 25"
-            if st.button("H26-H30", use_container_width=True):
-                habilidades_texto = "26 27 28 29 30"
+            # Os callbacks preenchem o campo de texto antes de ele ser criado
+            st.button("H1-H5", on_click=self._definir_estado,
+                      args=("habilidades_input", "1 2 3 4 5"), use_container_width=True)
+            st.button("H21-H25", on_click=self._definir_estado,
+                      args=("habilidades_input", "21 22 23 24 25"), use_container_width=True)
+            st.button("H26-H30", on_click=self._definir_estado,
+                      args=("habilidades_input", "26 27 28 29 30"), use_container_width=True)
         
         # Processa entrada
         habilidades = self._processar_habilidades(habilidades_texto)
         
         if habilidades:
             # Mostra resumo
-            st.success(f"✅ {len(habilidades)} habilidade(s) selecionada(s): H{', H'.join(map(str, sorted(habilidades)))}")
-            
-            # Aviso sobre habilidades por matéria
-            
-        
-        return habilidades
+            st.success(self._texto_memoizado(
+                "_habilidades_info",
+                tuple(sorted(habilidades)),
+                lambda habs: f"✅ {len(habs)} habilidade(s) selecionada(s): H{', H'.join(map(str, habs))}",
+                pendentes
+            ))
+        
+        return habilidades, pendentes
     
-    def _processar_habilidades(self, texto: str) -> List[int]:
+    def _processar_habilidades(self, texto: str) -> FrozenSet[int]:
         """
         Processa texto de entrada para extrair números de habilidades.
         
@@ -367,32 +393,17 @@ class InterfaceEntradas:
             texto: String com habilidades
             
         Returns:
-            Lista de números de habilidades
+            Conjunto de números de habilidades
         """
         if not texto:
-            return []
-        
-        # Remove 'H' ou 'h' e vírgulas, separa por espaços
-        texto_limpo = texto.upper().replace('H', '').replace(',', ' ')
-        
-        habilidades = []
-        invalidas = []
+            return frozenset()
         
-        for item in texto_limpo.split():
-            item = item.strip()
-            if item.isdigit():
-                num = int(item)
-                if 1 <= num <= 30:
-                    habilidades.append(num)
-                else:
-                    invalidas.append(item)
-            elif item:
-                invalidas.append(item)
+        habilidades, invalidas = separar_habilidades(texto)
         
         if invalidas:
             st.warning(f"⚠️ Valores ignorados (habilidades válidas são H1-H30): {', '.join(invalidas)}")
         
-        return list(set(habilidades))  # Remove duplicatas
+        return frozenset(habilidades)
     
     def _renderizar_filtro_numeros(self) -> Optional[List[int]]:
         """
@@ -418,6 +429,9 @@ class InterfaceEntradas:
         Returns:
             Quantidade de questões selecionada
         """
+        if "quantidade_input" not in st.session_state:
+            st.session_state.quantidade_input = self.QUANTIDADE_DEFAULT
+        
         col1, col2 = st.columns([2, 1])
         
         with col1:
@@ -425,24 +439,19 @@ class InterfaceEntradas:
                 "Quantidade total de questões",
                 min_value=self.QUANTIDADE_MIN,
                 max_value=self.QUANTIDADE_MAX,
-                value=self.QUANTIDADE_DEFAULT,
                 step=5,
-                help="Número total de questões a serem selecionadas de todos os anos"
+                help="Número total de questões a serem selecionadas de todos os anos",
+                key="quantidade_input"
             )
         
         with col2:
             st.write("Acesso rápido:")
-            if st.button("15", use_container_width=True):
-                quantidade = 15
-            if st.button("30", use_container_width=True):
-                quantidade = 30
-            if st.button("50", use_container_width=True):
-                quantidade = 50
-        
-        st.info(
-            f"📌 Serão selecionadas até {quantidade} questões no total, "
-            f"distribuídas entre os anos e matérias selecionados"
-        )
+            # Os callbacks alteram o valor do campo antes de ele ser criado
+            for valor in (15, 30, 50):
+                st.button(str(valor), on_click=self._definir_estado,
+                          args=("quantidade_input", valor), use_container_width=True)
+        
+        st.info(self._texto_quantidade(int(quantidade)))
         
         return int(quantidade)
     
@@ -451,25 +460,17 @@ class InterfaceEntradas:
         Processa string de entrada para extrair números válidos.
         
         Args:
-            entrada: String com números separados por espaço
+            entrada: String com números separados por espaço ou vírgula
             
         Returns:
             Lista de inteiros válidos
         """
-        numeros = []
-        invalidos = []
-        
-        for item in entrada.split():
-            item_limpo = item.strip()
-            if item_limpo.isdigit():
-                numeros.append(int(item_limpo))
-            else:
-                invalidos.append(item)
+        numeros, invalidos = separar_numeros(entrada)
         
         if invalidos:
             st.warning(f"⚠️ Valores ignorados (não são números válidos): {', '.join(invalidos)}")
         
-        return numeros
+        return list(numeros)
     
     def _renderizar_filtro_dificuldade(self) -> Tuple[int, int]:
         """
@@ -519,14 +520,25 @@ class InterfaceEntradas:
         
         return dif_min, dif_max
     
-    def _classificar_dificuldade(self, valor: int) -> str:
+    @staticmethod
+    @lru_cache(maxsize=QUANTIDADE_MAX + 1)
+    def _texto_quantidade(quantidade: int) -> str:
+        """Monta o aviso de quantidade (memoizado: um texto por valor possível)."""
+        return (
+            f"📌 Serão selecionadas até {quantidade} questões no total, "
+            f"distribuídas entre os anos e matérias selecionados"
+        )
+    
+    @classmethod
+    def _classificar_dificuldade(cls, valor: int) -> str:
         """Classifica o nível de dificuldade."""
-        if valor <= 400:
-            return "Fácil"
-        elif valor <= 800:
-            return "Médio"
-        else:
-            return "Difícil"
+        return cls._NIVEIS[min(max(valor, 0), len(cls._NIVEIS) - 1)]
+
+
+@st.cache_resource
+def _obter_interface() -> InterfaceEntradas:
+    """Retorna a instância da interface, criada uma única vez e reaproveitada entre reruns."""
+    return InterfaceEntradas()
 
 
 def entradas() -> Tuple[List[str], List[str], Optional[str], int, int, bool, Optional[int], bool, Optional[List[int]]]:
@@ -536,7 +548,7 @@ def entradas() -> Tuple[List[str], List[str], Optional[str], int, int, bool, Opt
     Returns:
         Tupla (anos, materias, posições, dif_max, dif_min, filtrar_quantidade, quantidade, filtrar_habilidade, habilidades)
     """
-    interface = InterfaceEntradas()
+    interface = _obter_interface()
     filtros = interface.renderizar()
     
     # Converte lista de números para string (compatibilidade)
@@ -544,16 +556,19 @@ def entradas() -> Tuple[List[str], List[str], Optional[str], int, int, bool, Opt
     if filtros.numeros_questoes:
         posicoes_str = " ".join(map(str, filtros.numeros_questoes))
     
+    # Habilidades seguem como lista ordenada (compatibilidade)
+    habilidades = sorted(filtros.habilidades) if filtros.habilidades else None
+    
     return (
-        filtros.anos,
-        filtros.materias,
+        list(filtros.anos),
+        list(filtros.materias),
         posicoes_str,
         filtros.dificuldade_maxima,
         filtros.dificuldade_minima,
         filtros.filtrar_por_quantidade,
         filtros.quantidade_questoes,
         filtros.filtrar_por_habilidade,
-        filtros.habilidades
+        habilidades
     )
 
 
@@ -564,7 +579,7 @@ def entradas_avancado() -> FiltrosQuestoes:
     Returns:
         Objeto FiltrosQuestoes validado
     """
-    interface = InterfaceEntradas()
+    interface = _obter_interface()
     filtros = interface.renderizar()
     
     # Valida os filtros
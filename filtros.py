@@ -0,0 +1,143 @@
+"""
+Definições puras dos filtros de questões do ENEM.
+Matérias, filtros selecionados e o processamento do texto digitado pelo
+usuário, sem depender do Streamlit.
+"""
+
+from typing import Tuple, Optional, FrozenSet
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+
+
+# Anos com provas disponíveis
+ANOS_DISPONIVEIS = [str(ano) for ano in range(2009, 2024)]
+
+# Tabelas de tradução: vírgulas (e, nas habilidades, o prefixo H) viram
+# espaço em uma única passada sobre o texto
+_HAB_TRANS = str.maketrans({'H': ' ', 'h': ' ', ',': ' '})
+_NUM_TRANS = str.maketrans({',': ' '})
+
+
+@lru_cache(maxsize=64)
+def separar_habilidades(texto: str) -> Tuple[Tuple[int, ...], Tuple[str, ...]]:
+    """Separa o texto em habilidades válidas (sem duplicatas, na ordem) e itens inválidos."""
+    # Dicionário como conjunto ordenado: remove duplicatas mantendo a ordem
+    habilidades = {}
+    invalidas = []
+    
+    for item in texto.translate(_HAB_TRANS).split():
+        if item.isdigit():
+            num = int(item)
+            if 1 <= num <= 30:
+                habilidades[num] = None
+            else:
+                invalidas.append(item)
+        else:
+            invalidas.append(item)
+    
+    return tuple(habilidades), tuple(invalidas)
+
+
+@lru_cache(maxsize=64)
+def separar_numeros(texto: str) -> Tuple[Tuple[int, ...], Tuple[str, ...]]:
+    """Separa o texto em números de questão válidos e itens inválidos."""
+    numeros = []
+    invalidos = []
+    
+    for item in texto.translate(_NUM_TRANS).split():
+        if item.isdigit():
+            numeros.append(int(item))
+        else:
+            invalidos.append(item)
+    
+    return tuple(numeros), tuple(invalidos)
+
+
+class Materia(Enum):
+    """Enumeração das matérias disponíveis no ENEM."""
+    MATEMATICA = ("MT", "Matemática", "mat")
+    LINGUAGENS = ("LC", "Linguagens", "ling")
+    HUMANAS = ("CH", "Ciências Humanas", "hum")
+    NATUREZA = ("CN", "Ciências da Natureza", "nat")
+    
+    @property
+    def codigo(self) -> str:
+        """Retorna o código da matéria."""
+        return self.value[0]
+    
+    @property
+    def nome(self) -> str:
+        """Retorna o nome completo da matéria."""
+        return self.value[1]
+    
+    @property
+    def checkbox_id(self) -> str:
+        """Retorna o ID para checkbox."""
+        return self.value[2]
+
+
+# Consultas sobre as matérias montadas uma única vez na importação
+MATERIA_ITEMS = tuple((m.nome, m.codigo, m.checkbox_id) for m in Materia)
+MATERIA_CODIGOS = tuple(codigo for _, codigo, _ in MATERIA_ITEMS)
+
+
+@dataclass(slots=True, frozen=True)
+class FiltrosQuestoes:
+    """Classe para armazenar os filtros selecionados pelo usuário."""
+    # Tuplas e frozenset: a instância congelada é hashável e pode ser
+    # usada como chave de cache
+    anos: Tuple[str, ...]  # Agora suporta múltiplos anos
+    materias: Tuple[str, ...]
+    numeros_questoes: Optional[Tuple[int, ...]]  # Na ordem informada
+    dificuldade_minima: int
+    dificuldade_maxima: int
+    filtrar_por_numero: bool
+    filtrar_por_dificuldade: bool
+    filtrar_por_quantidade: bool
+    quantidade_questoes: Optional[int]
+    filtrar_por_habilidade: bool
+    habilidades: Optional[FrozenSet[int]]  # Conjunto: consulta de pertinência em O(1)
+    
+    def validar(self) -> Tuple[bool, Optional[str]]:
+        """
+        Valida os filtros selecionados.
+        
+        Returns:
+            Tupla (válido, mensagem_erro)
+        """
+        # Lê as flags uma única vez
+        fnum = self.filtrar_por_numero
+        fqt = self.filtrar_por_quantidade
+        fdif = self.filtrar_por_dificuldade
+        fhab = self.filtrar_por_habilidade
+        
+        # Verifica conflito entre filtros (só flags, verificação mais barata)
+        if fnum and fqt:
+            return False, "Não é possível usar 'Selecionar por número' e 'Limitar quantidade' ao mesmo tempo"
+        
+        # Verifica se pelo menos um ano foi selecionado
+        if not self.anos:
+            return False, "Selecione pelo menos um ano"
+        
+        # Verifica se pelo menos uma matéria foi selecionada
+        if not self.materias:
+            return False, "Selecione pelo menos uma matéria"
+        
+        # Valida intervalo de dificuldade
+        if fdif and self.dificuldade_minima > self.dificuldade_maxima:
+            return False, "Dificuldade mínima não pode ser maior que a máxima"
+        
+        # Valida números das questões
+        if fnum and not self.numeros_questoes:
+            return False, "Digite os números das questões ou desmarque o filtro"
+        
+        # Valida quantidade de questões
+        if fqt and (not self.quantidade_questoes or self.quantidade_questoes <= 0):
+            return False, "A quantidade de questões deve ser maior que zero"
+        
+        # Valida habilidades
+        if fhab and not self.habilidades:
+            return False, "Digite as habilidades desejadas ou desmarque o filtro"
+        
+        return True, None
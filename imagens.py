@@ -0,0 +1,56 @@
+"""
+Processamento de imagens das questões antes de irem para o documento Word.
+O Pillow libera o GIL ao redimensionar e codificar, então a função roda
+direto nas threads de download.
+"""
+
+from io import BytesIO
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# Resolução usada para converter a largura no documento em pixels
+DPI_DOCUMENTO = 150
+
+
+def largura_em_pixels(largura_cm: float) -> int:
+    """Converte a largura de exibição em centímetros para pixels."""
+    return round(largura_cm / 2.54 * DPI_DOCUMENTO)
+
+
+def redimensionar_imagem(conteudo: bytes, largura_px: int) -> bytes:
+    """
+    Reduz a imagem para a largura de exibição e recomprime.
+    
+    Imagens que já cabem na largura, ou que não puderam ser abertas,
+    são devolvidas sem alteração.
+    
+    Args:
+        conteudo: Bytes da imagem original
+        largura_px: Largura máxima em pixels
+    
+    Returns:
+        Bytes da imagem (JPEG se a original era JPEG, PNG caso contrário)
+    """
+    if Image is None:
+        return conteudo
+    
+    try:
+        with Image.open(BytesIO(conteudo)) as imagem:
+            if imagem.width <= largura_px:
+                return conteudo
+            
+            formato = "JPEG" if imagem.format == "JPEG" else "PNG"
+            imagem.thumbnail((largura_px, largura_px * 10))
+            
+            saida = BytesIO()
+            if formato == "JPEG":
+                imagem.save(saida, format=formato, optimize=True, quality=85)
+            else:
+                imagem.save(saida, format=formato, optimize=True)
+            return saida.getvalue()
+    except Exception:
+        return conteudo
@@ -7,26 +7,91 @@ import pandas as pd
 from docx import Document
 from docx.shared import Pt, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.shape import CT_Inline
 import os
 import json
+import hashlib
+import tempfile
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from io import BytesIO
 import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 import logging
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 
-from ListaProva import provas_regulares
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ListaProva import provas_regulares, CODE_BY_YEAR_AREA
 from config_docx import configurar_documento, adicionar_paragrafo_formatado
 from entradas import entradas
+from imagens import largura_em_pixels, redimensionar_imagem
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@lru_cache(maxsize=4096)
+def _load_json(caminho: str) -> Dict:
+    """
+    Lê e decodifica um arquivo JSON, memoizado pelo caminho.
+    
+    Usa o orjson quando disponível e o módulo json caso contrário.
+    """
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    if orjson is not None:
+        return orjson.loads(conteudo)
+    return json.loads(conteudo)
+
+
+@lru_cache(maxsize=None)
+def _preparar_cache_imagens(pasta: Path, tamanho_max: int, idade_max: float) -> bool:
+    """
+    Cria a pasta do cache de imagens em disco e descarta o excedente.
+    
+    Executado uma única vez por processo (e não a cada rerun). Saem os
+    arquivos gravados há mais de idade_max segundos e, dos restantes, os
+    mais antigos até o total caber em tamanho_max bytes.
+    
+    Returns:
+        True se o cache em disco está disponível
+    """
+    try:
+        pasta.mkdir(parents=True, exist_ok=True)
+        
+        arquivos = []
+        with os.scandir(pasta) as entradas:
+            for entrada in entradas:
+                if entrada.is_file():
+                    info = entrada.stat()
+                    arquivos.append((info.st_mtime, info.st_size, entrada.path))
+    except OSError as e:
+        logger.warning(f"Cache de imagens em disco indisponível: {e}")
+        return False
+    
+    agora = time.time()
+    total = 0
+    for mtime, tamanho, caminho in sorted(arquivos, reverse=True):
+        total += tamanho
+        if total > tamanho_max or agora - mtime > idade_max:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+    return True
+
+
+@dataclass(slots=True, frozen=True)
 class Questao:
     """Representa uma questão do ENEM com todos seus dados."""
     numero: int
@@ -43,10 +108,11 @@ class Questao:
     
     def __post_init__(self):
         """Inicializa listas vazias se não fornecidas."""
+        # Classe congelada: a atribuição precisa passar por object.__setattr__
         if self.alternativas is None:
-            self.alternativas = []
+            object.__setattr__(self, "alternativas", [])
         if self.arquivos is None:
-            self.arquivos = []
+            object.__setattr__(self, "arquivos", [])
 
 
 class GeradorDocumento:
@@ -58,10 +124,45 @@ class GeradorDocumento:
     LARGURA_IMAGEM_ALTERNATIVA = 5  # cm
     TAMANHO_FONTE_REFERENCIA = 7  # pt
     
+    # Imagens em markdown no contexto: ![descrição](url)
+    _IMG_RE = re.compile(r'!\[[^\]]*\]\(([^)]+)\)')
+    
+    # Downloads de imagens feitos em paralelo antes de montar o documento
+    MAX_DOWNLOADS_SIMULTANEOS = 16
+    
+    # Tempo limite das requisições: (conexão, leitura) em segundos
+    TIMEOUT_DOWNLOAD = (3.05, 10)
+    
+    # Imagens baixadas ficam em disco e são reaproveitadas entre execuções,
+    # limitadas em tamanho total (bytes) e idade (segundos)
+    PASTA_CACHE_IMAGENS = Path.home() / ".cache" / "enem_imgs"
+    TAMANHO_MAX_CACHE_IMAGENS = 500 * 1024 * 1024
+    IDADE_MAX_CACHE_IMAGENS = 30 * 24 * 3600
+    
     def __init__(self):
         """Inicializa o gerador de documentos."""
         self.doc = None
         self.imagens_cache = {}
+        # (url, largura) -> (rId, nome, cx, cy) das imagens já inseridas no documento atual
+        self._imagens_inseridas = {}
+        self.session = self._criar_sessao()
+        self._cache_disco = _preparar_cache_imagens(
+            self.PASTA_CACHE_IMAGENS,
+            self.TAMANHO_MAX_CACHE_IMAGENS,
+            self.IDADE_MAX_CACHE_IMAGENS
+        )
+    
+    def _criar_sessao(self) -> requests.Session:
+        """Cria sessão HTTP com pool de conexões reaproveitadas e novas tentativas."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
     
     def criar_documento(self, questoes: List[Questao], anos: List[str]) -> Document:
         """
@@ -76,6 +177,10 @@ class GeradorDocumento:
         """
         self.doc = Document()
         self.doc = configurar_documento(self.doc)
+        self._imagens_inseridas = {}
+        
+        # Baixa todas as imagens de uma vez, em paralelo
+        self._prefetch_imagens(self._coletar_urls_imagens(questoes))
         
         # Adiciona questões
         for questao in questoes:
@@ -86,6 +191,112 @@ class GeradorDocumento:
         
         return self.doc
     
+    def _coletar_urls_imagens(self, questoes: List[Questao]) -> Dict[str, float]:
+        """
+        Reúne as URLs de imagens de todas as questões, sem repetições.
+        
+        Args:
+            questoes: Lista de questões do documento
+            
+        Returns:
+            Dicionário URL -> maior largura de exibição (cm), apenas com
+            URLs ainda não presentes no cache
+        """
+        urls = {}
+        
+        def registrar(url: str, largura_cm: float):
+            urls[url] = max(largura_cm, urls.get(url, 0))
+        
+        for questao in questoes:
+            if questao.contexto:
+                _, urls_contexto = self._split_contexto(questao.contexto)
+                for url in urls_contexto:
+                    registrar(url, self.LARGURA_IMAGEM_CONTEXTO)
+            for url in questao.arquivos:
+                registrar(url, self.LARGURA_IMAGEM_QUESTAO)
+            for alt in questao.alternativas:
+                if alt.get('file'):
+                    registrar(alt['file'], self.LARGURA_IMAGEM_ALTERNATIVA)
+        
+        return {url: largura for url, largura in urls.items() if url not in self.imagens_cache}
+    
+    def _baixar_imagem(self, url: str, largura_px: Optional[int] = None) -> bytes:
+        """
+        Obtém o conteúdo de uma imagem, do cache em disco ou da rede.
+        
+        Args:
+            url: URL da imagem
+            largura_px: Largura de exibição; se informada, a imagem é reduzida
+                e é a versão reduzida que fica no cache em disco
+        
+        Returns:
+            Bytes da imagem
+        """
+        chave = url if largura_px is None else f"{url}#{largura_px}"
+        caminho = self.PASTA_CACHE_IMAGENS / hashlib.sha1(chave.encode()).hexdigest()
+        if self._cache_disco:
+            try:
+                return caminho.read_bytes()
+            except OSError:
+                pass
+        
+        resp = self.session.get(url, timeout=self.TIMEOUT_DOWNLOAD)
+        resp.raise_for_status()
+        conteudo = resp.content
+        if largura_px is not None:
+            conteudo = redimensionar_imagem(conteudo, largura_px)
+        
+        if self._cache_disco:
+            self._gravar_cache_disco(caminho, conteudo)
+        return conteudo
+    
+    def _gravar_cache_disco(self, caminho: Path, conteudo: bytes):
+        """Grava a imagem no cache em disco (falhas apenas desativam o cache)."""
+        # O cache é compartilhado por todas as sessões e threads: cada escrita
+        # usa um temporário próprio, renomeado só no fim para nunca deixar um
+        # arquivo pela metade
+        temporario = None
+        try:
+            with tempfile.NamedTemporaryFile(dir=caminho.parent, suffix=".tmp", delete=False) as f:
+                temporario = f.name
+                f.write(conteudo)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            logger.warning(f"Erro ao gravar imagem no cache em disco: {e}")
+            if temporario is not None:
+                try:
+                    os.unlink(temporario)
+                except OSError:
+                    pass
+    
+    def _prefetch_imagens(self, urls: Dict[str, float]):
+        """
+        Baixa as imagens em paralelo, reduz ao tamanho de exibição e guarda no cache.
+        
+        Falhas de download são apenas registradas; a imagem é tentada de
+        novo ao ser adicionada ao documento.
+        
+        Args:
+            urls: Dicionário URL -> largura de exibição (cm)
+        """
+        if not urls:
+            return
+        
+        # O redimensionamento roda nas próprias threads de download (o
+        # Pillow libera o GIL) e o resultado reduzido vai para o cache em disco
+        workers = min(self.MAX_DOWNLOADS_SIMULTANEOS, len(urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futuros = {
+                executor.submit(self._baixar_imagem, url, largura_em_pixels(largura)): url
+                for url, largura in urls.items()
+            }
+            for futuro in as_completed(futuros):
+                url = futuros[futuro]
+                try:
+                    self.imagens_cache[url] = BytesIO(futuro.result())
+                except Exception as e:
+                    logger.warning(f"Erro ao baixar imagem {url}: {e}")
+    
     def _adicionar_questao(self, questao: Questao):
         """Adiciona uma questão completa ao documento."""
         # Título da questão
@@ -131,24 +342,30 @@ class GeradorDocumento:
         Returns:
             Set de URLs de imagens processadas
         """
-        # Pattern para identificar imagens em markdown
-        pattern = r'!\[[^\]]*\]\(([^)]+)\)'
-        partes = re.split(pattern, contexto)
+        textos, urls = self._split_contexto(contexto)
         
-        imagens_processadas = set()
+        # Cada imagem fica entre dois trechos de texto (possivelmente vazios)
+        for i, texto in enumerate(textos):
+            if texto:
+                adicionar_paragrafo_formatado(self.doc, texto)
+            if i < len(urls):
+                self._adicionar_imagem(urls[i], self.LARGURA_IMAGEM_CONTEXTO)
         
-        for i, parte in enumerate(partes):
-            if i % 2 == 0:
-                # Parte de texto
-                if parte.strip():
-                    adicionar_paragrafo_formatado(self.doc, parte.strip())
-            else:
-                # URL de imagem
-                img_url = parte.strip()
-                imagens_processadas.add(img_url)
-                self._adicionar_imagem(img_url, self.LARGURA_IMAGEM_CONTEXTO)
+        return set(urls)
+    
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _split_contexto(contexto: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Separa o contexto em trechos de texto e URLs de imagens (memoizado).
         
-        return imagens_processadas
+        Returns:
+            Tupla (trechos de texto, URLs), com len(trechos) == len(URLs) + 1
+        """
+        partes = GeradorDocumento._IMG_RE.split(contexto)
+        textos = tuple(parte.strip() for parte in partes[::2])
+        urls = tuple(parte.strip() for parte in partes[1::2])
+        return textos, urls
     
     def _adicionar_imagens_questao(self, urls_imagens: List[str], 
                                   imagens_ja_processadas: Optional[set] = None):
@@ -172,25 +389,58 @@ class GeradorDocumento:
             True se sucesso, False caso contrário
         """
         try:
-            # Verifica cache
-            if url in self.imagens_cache:
-                img_data = self.imagens_cache[url]
-                img_data.seek(0)  # Reseta posição do buffer
-            else:
-                # Baixa imagem
-                resp = requests.get(url, timeout=10)
-                resp.raise_for_status()
-                img_data = BytesIO(resp.content)
-                self.imagens_cache[url] = img_data
+            img_data = self._get_cached_image(url)
             
             # Adiciona ao documento
-            self.doc.add_picture(img_data, width=Cm(largura_cm))
+            run = self.doc.add_paragraph().add_run()
+            self._inserir_imagem(run, url, img_data, largura_cm)
             return True
             
         except Exception as e:
             logger.warning(f"Erro ao adicionar imagem {url}: {e}")
             return False
     
+    def _get_cached_image(self, url: str) -> BytesIO:
+        """
+        Retorna a imagem do cache, baixando e guardando se ainda não estiver lá.
+        
+        Args:
+            url: URL da imagem
+            
+        Returns:
+            Buffer da imagem posicionado no início
+        """
+        img_data = self.imagens_cache.get(url)
+        if img_data is None:
+            # Não veio no prefetch: baixa agora
+            img_data = BytesIO(self._baixar_imagem(url))
+            self.imagens_cache[url] = img_data
+        else:
+            img_data.seek(0)  # Reseta posição do buffer
+        return img_data
+    
+    def _inserir_imagem(self, run: Any, url: str, img_data: BytesIO, largura_cm: float):
+        """
+        Insere a imagem no run, reaproveitando a parte de imagem já empacotada.
+        
+        Na primeira vez a imagem é lida e registrada no pacote, como no
+        add_picture; nas seguintes o desenho apenas referencia o mesmo rId,
+        sem reler nem recalcular as dimensões da imagem.
+        """
+        chave = (url, largura_cm)
+        parte = run.part
+        
+        dados = self._imagens_inseridas.get(chave)
+        if dados is None:
+            rId, imagem = parte.get_or_add_image(img_data)
+            cx, cy = imagem.scaled_dimensions(Cm(largura_cm), None)
+            dados = (rId, imagem.filename, cx, cy)
+            self._imagens_inseridas[chave] = dados
+        
+        rId, nome, cx, cy = dados
+        inline = CT_Inline.new_pic_inline(parte.next_id, rId, nome, cx, cy)
+        run._r.add_drawing(inline)
+    
     def _adicionar_referencias(self, referencias: str):
         """Adiciona referências formatadas."""
         ref_par = self.doc.add_paragraph(referencias)
@@ -223,12 +473,10 @@ class GeradorDocumento:
             
             # Tenta adicionar a imagem inline
             try:
-                resp = requests.get(arquivo, timeout=10)
-                resp.raise_for_status()
-                img_data = BytesIO(resp.content)
+                img_data = self._get_cached_image(arquivo)
                 
                 run = par.add_run()
-                run.add_picture(img_data, width=Cm(self.LARGURA_IMAGEM_ALTERNATIVA))
+                self._inserir_imagem(run, arquivo, img_data, self.LARGURA_IMAGEM_ALTERNATIVA)
                 
             except Exception as e:
                 logger.warning(f"Erro ao adicionar imagem da alternativa {letra}: {e}")
@@ -255,6 +503,13 @@ class GeradorDocumento:
 class ProcessadorQuestoes:
     """Classe para processar e filtrar questões do banco de dados."""
     
+    # Colunas da base consolidada usadas na filtragem e na montagem das questões
+    COLUNAS_NECESSARIAS = ['ANO_PROVA', 'SG_AREA', 'CO_PROVA', 'CO_POSICAO',
+                           'CO_HABILIDADE', 'NU_PARAM_B', 'TX_GABARITO']
+    COLUNAS_NUMERICAS = ['CO_HABILIDADE', 'NU_PARAM_B']
+    # Poucos valores distintos: guardadas como categorias
+    COLUNAS_CATEGORICAS = ['SG_AREA', 'CO_PROVA', 'TX_GABARITO']
+    
     def __init__(self, pasta_csv: str, pasta_json: str):
         """
         Inicializa o processador.
@@ -267,10 +522,40 @@ class ProcessadorQuestoes:
         self.pasta_json = Path(pasta_json)
         self.df_consolidado = None
         self._carregar_csv_consolidado()
+        
+        # Questões agrupadas por ano, para consulta direta em carregar_questoes
+        self._groups_by_ano = {}
+        if not self.df_consolidado.empty:
+            self._groups_by_ano = {
+                int(ano): df_ano
+                for ano, df_ano in self.df_consolidado.groupby("ANO_PROVA", sort=False)
+            }
+        # Os grupos já são cópias: a base inteira não precisa ficar em memória
+        self.df_consolidado = None
     
     def _carregar_csv_consolidado(self):
-        """Carrega o arquivo CSV consolidado uma única vez."""
+        """
+        Carrega a base consolidada uma única vez.
+        
+        Usa o cache Parquet quando ele está atualizado em relação ao CSV;
+        caso contrário lê o CSV e regrava o cache.
+        
+        O cache tem arquivo próprio, só com as colunas necessárias: o
+        ITENS_PROVA_CONSOLIDADO.parquet, com todas as colunas, é gerado
+        pelo Consolidar_BD.py e nunca é sobrescrito aqui.
+        """
         arquivo = self.pasta_csv / "ITENS_PROVA_CONSOLIDADO.csv"
+        arquivo_parquet = self.pasta_csv / "ITENS_PROVA_APP.parquet"
+        
+        if self._parquet_atualizado(arquivo, arquivo_parquet):
+            try:
+                self.df_consolidado = self._otimizar_tipos(
+                    pd.read_parquet(arquivo_parquet, columns=self.COLUNAS_NECESSARIAS)
+                )
+                logger.info(f"Parquet consolidado carregado: {len(self.df_consolidado)} registros")
+                return
+            except Exception as e:
+                logger.warning(f"Erro ao carregar Parquet consolidado, usando o CSV: {e}")
         
         if not arquivo.exists():
             logger.error(f"Arquivo consolidado nção encontrado: {arquivo}")
@@ -282,23 +567,51 @@ class ProcessadorQuestoes:
                 arquivo,
                 sep=";",
                 encoding="utf-8",
-                decimal=","
+                decimal=",",
+                usecols=lambda col: col in self.COLUNAS_NECESSARIAS
             )
             
-            colunas_numericas = ['CO_HABILIDADE', 'NU_PARAM_A', 'NU_PARAM_B', 'NU_PARAM_C']
-            for col in colunas_numericas:
+            for col in self.COLUNAS_NUMERICAS:
                 if col in self.df_consolidado.columns:
                     self.df_consolidado[col] = pd.to_numeric(
                         self.df_consolidado[col],
                         errors='coerce'
                     )
+            self.df_consolidado = self._otimizar_tipos(self.df_consolidado)
                 
             logger.info(f"CSV consolidado carregado: {len(self.df_consolidado)} registros")
         except Exception as e:
             logger.error(f"Erro ao carregar CSV consolidado: {e}")
             self.df_consolidado = pd.DataFrame()
-            
-            
+            return
+        
+        try:
+            self.df_consolidado.to_parquet(arquivo_parquet, index=False, compression="zstd")
+        except Exception as e:
+            # pyarrow é opcional: sem ele segue-se lendo o CSV
+            logger.warning(f"Cache Parquet não gravado: {e}")
+    
+    @staticmethod
+    def _parquet_atualizado(arquivo_csv: Path, arquivo_parquet: Path) -> bool:
+        """Verifica se o Parquet existe e não é mais antigo que o CSV."""
+        if not arquivo_parquet.exists():
+            return False
+        if not arquivo_csv.exists():
+            return True
+        return arquivo_parquet.stat().st_mtime >= arquivo_csv.stat().st_mtime
+    
+    def _otimizar_tipos(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte colunas de poucos valores em categorias e os inteiros em int16."""
+        for col in self.COLUNAS_CATEGORICAS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+        df["ANO_PROVA"] = df["ANO_PROVA"].astype("int16")
+        df["CO_POSICAO"] = df["CO_POSICAO"].astype("int16")
+        # Nem toda questão tem habilidade: inteiro que aceita ausentes
+        if "CO_HABILIDADE" in df.columns:
+            df["CO_HABILIDADE"] = df["CO_HABILIDADE"].astype("Int16")
+        return df
+    
     def carregar_questoes(self, anos: List[str], materias: List[str], 
                          filtros: Dict) -> pd.DataFrame:
         """
@@ -312,39 +625,42 @@ class ProcessadorQuestoes:
         Returns:
             DataFrame filtrado com as questões de todos os anos
         """
-        if self.df_consolidado is None or self.df_consolidado.empty:
+        if not self._groups_by_ano:
             logger.error("DataFrame consolidado não disponível")
             return pd.DataFrame()
         
         # Converte anos para int para comparação
         anos_int = [int(ano) for ano in anos]
         
-        # Filtra por anos selecionados
-        df_anos = self.df_consolidado[
-            self.df_consolidado['ANO_PROVA'].isin(anos_int)
-        ].copy()
-        
-        if df_anos.empty:
+        if not any(ano in self._groups_by_ano for ano in anos_int):
             logger.warning(f"Nenhuma questão encontrada para os anos: {anos}")
             return pd.DataFrame()
         
         # Lista para armazenar DataFrames de cada ano
         dataframes_anos = []
         
+        # ANO como categoria, com as categorias em ordem crescente de ano: a
+        # ordenação (e o limite de quantidade) fica igual à da antiga coluna texto
+        categorias_ano = sorted(str(ano) for ano in anos_int)
+        
         # Processa cada ano
         for ano in anos_int:
-            df_ano = df_anos[df_anos['ANO_PROVA'] == ano].copy()
+            df_ano = self._groups_by_ano.get(ano)
+            if df_ano is None or df_ano.empty:
+                continue
             df_ano_filtrado = self._aplicar_filtros(df_ano, str(ano), materias, filtros)
             
             if not df_ano_filtrado.empty:
-                df_ano_filtrado['ANO'] = str(ano)
+                df_ano_filtrado = df_ano_filtrado.assign(ANO=pd.Categorical(
+                    [str(ano)] * len(df_ano_filtrado), categories=categorias_ano
+                ))
                 dataframes_anos.append(df_ano_filtrado)
         
         # Combina todos os DataFrames
         if not dataframes_anos:
             return pd.DataFrame()
     
-        df_combinado = pd.concat(dataframes_anos, ignore_index=True)
+        df_combinado = pd.concat(dataframes_anos, ignore_index=True, sort=False)
         
         # Aplica filtros globais
         df_final = self._aplicar_filtros_globais(df_combinado, filtros)
@@ -358,7 +674,12 @@ class ProcessadorQuestoes:
     
     def _aplicar_filtros(self, df: pd.DataFrame, ano: str, 
                         materias: List[str], filtros: Dict) -> pd.DataFrame:
-        """Aplica filtros ao DataFrame de um ano específico."""
+        """
+        Aplica filtros ao DataFrame de um ano específico.
+        
+        Todos os filtros são combinados em uma única máscara booleana e o
+        DataFrame é recortado uma só vez.
+        """
         # Obtém códigos das provas
         provas_escolhidas = self._obter_provas_escolhidas(ano, materias)
         
@@ -367,27 +688,38 @@ class ProcessadorQuestoes:
             return pd.DataFrame()
         
         # Filtro base por matéria e prova
-        df_filtrado = df[
-            (df["SG_AREA"].isin(materias)) & 
-            (df["CO_PROVA"].isin(provas_escolhidas.values()))
-        ].copy()
+        mascara = (
+            df["SG_AREA"].isin(materias) & 
+            df["CO_PROVA"].isin(provas_escolhidas.values())
+        )
         
         # Filtro por habilidade
         if filtros.get("filtrar_habilidade") and filtros.get("habilidades"):
-            df_filtrado = self._filtrar_por_habilidade(df_filtrado, filtros["habilidades"])
+            mascara &= self._mascara_habilidade(df, mascara, filtros["habilidades"], ano)
         
         # Filtro por posição
+        posicoes = None
         if filtros.get("posicoes"):
-            df_filtrado = self._filtrar_por_posicao(df_filtrado, filtros["posicoes"])
+            posicoes = self._converter_posicoes(filtros["posicoes"])
+            if posicoes:
+                mascara &= df["CO_POSICAO"].isin(posicoes)
         
         # Filtro por dificuldade (se não for filtro por posição)
         elif filtros.get("filtrar_dificuldade", True):
-            df_filtrado = self._filtrar_por_dificuldade(
-                df_filtrado, 
+            mascara_dif = self._mascara_dificuldade(
+                df, 
                 filtros.get("min_dif", 0), 
                 filtros.get("max_dif", 2000)
             )
+            if mascara_dif is not None:
+                mascara &= mascara_dif
         
+        df_filtrado = df.loc[mascara]
+        
+        # Ordena na ordem das posições informadas; a ordenação por
+        # dificuldade é feita uma única vez em _aplicar_filtros_globais
+        if posicoes:
+            return self._filtrar_por_posicao(df_filtrado, posicoes)
         return df_filtrado
     
     def _obter_provas_escolhidas(self, ano: str, materias: List[str]) -> Dict:
@@ -396,99 +728,88 @@ class ProcessadorQuestoes:
             logger.warning(f"Ano {ano} não encontrado em provas_regulares")
             return {}
         
-        provas = {}
-        for materia in materias:
-            if materia in provas_regulares[ano]:
-                provas[materia] = provas_regulares[ano][materia]
-            else:
-                logger.warning(f"Matéria {materia} não encontrada para o ano {ano}")
+        # Consulta direta na tabela (ano, área) -> código da prova
+        ano_int = int(ano)
+        provas = {
+            m: CODE_BY_YEAR_AREA[(ano_int, m)]
+            for m in materias if (ano_int, m) in CODE_BY_YEAR_AREA
+        }
+        
+        # Um único aviso com todas as matérias ausentes
+        if len(provas) < len(materias):
+            faltando = [m for m in materias if m not in provas]
+            logger.warning(f"Matérias não encontradas no ano {ano}: {faltando}")
         
         return provas
     
-    def _filtrar_por_habilidade(self, 
-                                df: pd.DataFrame, 
-                                habilidades: List[int],
-                                ano: str = None) -> pd.DataFrame:
+    def _mascara_habilidade(self, 
+                            df: pd.DataFrame, 
+                            mascara_base: pd.Series,
+                            habilidades: List[int],
+                            ano: str = None) -> pd.Series:
         """
-        Filtra DataFrame por habilidades específicas.
+        Monta a máscara das questões com as habilidades específicas.
         
         Args:
             df: DataFrame a filtrar
+            mascara_base: Máscara já aplicada (usada apenas no log)
             habilidades: Lista de números de habilidades
+            ano: Ano da prova (usado apenas no log)
             
         Returns:
-            DataFrame filtrado
+            Máscara booleana alinhada ao DataFrame
         """
-        if df.empty or "CO_HABILIDADE" not in df.columns:
-            return df
-        
-        df_filtrado = df.copy()
-        df_filtrado['CO_HABILIDADE'] = pd.to_numeric(
-            df_filtrado['CO_HABILIDADE'],
-            errors='coerce'
-        )
-        
-        # Converte habilidades para float para comparação
-        habilidades_float = [float(h) for h in habilidades]
+        if "CO_HABILIDADE" not in df.columns:
+            return pd.Series(True, index=df.index)
         
-        # Filtra mantendo apenas as habilidades desejadas
-        df_filtrado = df_filtrado[df_filtrado["CO_HABILIDADE"].isin(habilidades_float)].copy()
+        # CO_HABILIDADE já é inteiro (Int16) desde o carregamento
+        mascara = df["CO_HABILIDADE"].isin({int(h) for h in habilidades})
         
-        if df_filtrado.empty:
+        encontradas = int((mascara & mascara_base).sum())
+        if not encontradas:
             ano_info = f" do ano {ano}" if ano else ""
             logger.warning(f"Nenhuma questão encontrada para as habilidades: {habilidades}{ano_info}")
         else:
             ano_info = f" no ano {ano}" if ano else ""
-            logger.info(f"Encontradas {len(df_filtrado)} questões para as habilidades selecionadas no ano{ano_info}")
+            logger.info(f"Encontradas {encontradas} questões para as habilidades selecionadas{ano_info}")
         
-        return df_filtrado
+        return mascara
+    
+    def _converter_posicoes(self, posicoes_str: str) -> List[int]:
+        """Converte a string de posições em lista de inteiros."""
+        return [int(p.strip()) for p in posicoes_str.split() 
+                if p.strip().isdigit()]
     
     def _filtrar_por_posicao(self, df: pd.DataFrame, 
-                            posicoes_str: str) -> pd.DataFrame:
-        """Filtra DataFrame por posições específicas."""
-        # Converte string de posições para lista
-        posicoes = [int(p.strip()) for p in posicoes_str.split() 
-                   if p.strip().isdigit()]
-        
-        if not posicoes:
-            return df
+                            posicoes: List[int]) -> pd.DataFrame:
+        """Remove posições duplicadas e ordena conforme a ordem fornecida."""
+        # Remove duplicatas (o filtro por posição já está na máscara)
+        df_unico = df.drop_duplicates(subset=["CO_POSICAO"]).set_index("CO_POSICAO")
         
-        # Filtra e remove duplicatas
-        df_filtrado = df[df["CO_POSICAO"].isin(posicoes)].drop_duplicates(
-            subset=["CO_POSICAO"]
-        ).copy()
+        # Ordem fornecida, sem repetições e só com as posições encontradas,
+        # para o reindex não criar linhas vazias
+        presentes = set(df_unico.index)
+        ordem = [p for p in dict.fromkeys(posicoes) if p in presentes]
         
-        # Ordena conforme ordem fornecida
-        df_filtrado["CO_POSICAO"] = pd.Categorical(
-            df_filtrado["CO_POSICAO"], 
-            categories=posicoes, 
-            ordered=True
-        )
-        
-        return df_filtrado.sort_values("CO_POSICAO")
+        return df_unico.reindex(ordem).reset_index()
     
-    def _filtrar_por_dificuldade(self, df: pd.DataFrame, 
-                                 min_dif: float, max_dif: float) -> pd.DataFrame:
-        """Filtra DataFrame por intervalo de dificuldade."""
-        if df.empty:
-            return df
+    def _mascara_dificuldade(self, df: pd.DataFrame, 
+                             min_dif: float, max_dif: float) -> Optional[pd.Series]:
+        """
+        Monta a máscara do intervalo de dificuldade.
         
-        # Se não há filtro de dificuldade, apenas ordena
+        Returns:
+            Máscara booleana, ou None se o intervalo é o completo
+        """
+        # Sem filtro de dificuldade
         if min_dif == 0 and max_dif == 2000:
-            return df.sort_values("NU_PARAM_B")
+            return None
         
-        # Aplica filtros
         if min_dif == 0:
-            df_filtrado = df[df["NU_PARAM_B"] <= max_dif].copy()
-        elif max_dif == 2000:
-            df_filtrado = df[df["NU_PARAM_B"] >= min_dif].copy()
-        else:
-            df_filtrado = df[
-                (df["NU_PARAM_B"] >= min_dif) & 
-                (df["NU_PARAM_B"] <= max_dif)
-            ].copy()
-        
-        return df_filtrado.sort_values("NU_PARAM_B")
+            return df["NU_PARAM_B"] <= max_dif
+        if max_dif == 2000:
+            return df["NU_PARAM_B"] >= min_dif
+        return df["NU_PARAM_B"].between(min_dif, max_dif)
     
     def _aplicar_filtros_globais(self, df: pd.DataFrame, filtros: Dict) -> pd.DataFrame:
         """
@@ -504,17 +825,17 @@ class ProcessadorQuestoes:
         if df.empty:
             return df
         
-        df_final = df.copy()
+        df_final = df
+        
+        # Ordena todos os anos de uma vez por ano e dificuldade (estável);
+        # com filtro por posição vale a ordem informada pelo usuário
+        if not filtros.get("posicoes") and filtros.get("filtrar_dificuldade", True):
+            df_final = df_final.sort_values(["ANO", "NU_PARAM_B"], kind="mergesort")
         
         # Aplica filtro de quantidade se especificado
         if filtros.get("filtrar_quantidade") and filtros.get("quantidade"):
             quantidade_max = filtros["quantidade"]
             if len(df_final) > quantidade_max:
-                # Se já está ordenado por dificuldade, mantém ordem
-                # Caso contrário, ordena por ano e dificuldade
-                if not filtros.get("posicoes"):
-                    df_final = df_final.sort_values(["ANO", "NU_PARAM_B"])
-                
                 df_final = df_final.head(quantidade_max)
                 logger.info(f"Limitado a {quantidade_max} questões conforme solicitado")
         
@@ -538,19 +859,18 @@ class ProcessadorQuestoes:
             return None
         
         try:
-            with open(arquivo, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _load_json(str(arquivo))
         except Exception as e:
             logger.error(f"Erro ao carregar JSON: {e}")
             return None
     
-    def criar_objeto_questao(self, row: pd.Series, dados_json: Dict, 
+    def criar_objeto_questao(self, row: Dict, dados_json: Dict, 
                            numero: int, ano: int) -> Questao:
         """
         Cria objeto Questao a partir dos dados.
         
         Args:
-            row: Linha do DataFrame
+            row: Valores da linha do DataFrame, por coluna
             dados_json: Dados do JSON
             numero: Número sequencial da questão
             ano: Ano da prova
@@ -581,15 +901,30 @@ class ProcessadorQuestoes:
         )
 
 
+@st.cache_resource
+def _obter_processador() -> ProcessadorQuestoes:
+    """Retorna o processador com a base já carregada, reaproveitado entre reruns."""
+    return ProcessadorQuestoes(
+        pasta_csv="base-de-dados-CSV",
+        pasta_json=os.path.join("enem-api", "public")
+    )
+
+
 class AplicacaoENEM:
     """Classe principal da aplicação."""
     
+    # Intervalo mínimo entre atualizações da barra de progresso (segundos)
+    INTERVALO_PROGRESSO = 0.1
+    
+    # Arquivos JSON de questões lidos em paralelo
+    MAX_LEITURAS_SIMULTANEAS = 32
+    
+    # Colunas do DataFrame usadas para montar cada questão
+    COLUNAS_QUESTAO = ("CO_POSICAO", "CO_HABILIDADE", "NU_PARAM_B", "TX_GABARITO")
+    
     def __init__(self):
         """Inicializa a aplicação."""
-        self.processador = ProcessadorQuestoes(
-            pasta_csv="base-de-dados-CSV",
-            pasta_json=os.path.join("enem-api", "public")
-        )
+        self.processador = _obter_processador()
         self.gerador = GeradorDocumento()
     
     def executar(self):
@@ -669,28 +1004,49 @@ class AplicacaoENEM:
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        for idx, (_, row) in enumerate(df.iterrows(), start=1):
-            # Atualiza progresso
-            progress = idx / total
-            progress_bar.progress(progress)
-            status_text.text(f"Processando questão {idx} de {total}...")
-            
-            # Obtém ano da linha
-            ano = int(row["ANO"]) if "ANO" in row else int(row.name)
-            
-            # Carrega dados JSON
-            dados_json = self.processador.carregar_detalhes_questao(
-                ano, 
-                int(row["CO_POSICAO"])
+        # Colunas extraídas uma vez como arrays, sem criar uma Series por linha
+        colunas = {col: df[col].to_numpy() for col in self.COLUNAS_QUESTAO}
+        anos = df["ANO"].to_numpy() if "ANO" in df.columns else df.index.to_numpy()
+        
+        # Ano e posição de cada linha, na ordem do DataFrame
+        tarefas = list(zip(
+            range(1, total + 1),
+            map(int, anos),
+            map(int, colunas["CO_POSICAO"])
+        ))
+        
+        # Cada atualização da barra é uma mensagem ao navegador: só é enviada
+        # quando o percentual muda e o intervalo mínimo já passou
+        ultimo_pct = -1
+        ultimo_t = 0.0
+        
+        # Os JSONs são lidos em paralelo; map devolve os resultados na ordem
+        # das tarefas e o progresso continua sendo atualizado nesta thread
+        with ThreadPoolExecutor(max_workers=self.MAX_LEITURAS_SIMULTANEAS) as executor:
+            detalhes = executor.map(
+                lambda tarefa: self.processador.carregar_detalhes_questao(tarefa[1], tarefa[2]),
+                tarefas
             )
             
-            if dados_json:
-                questao = self.processador.criar_objeto_questao(
-                    row, dados_json, idx, ano
-                )
-                questoes.append(questao)
-            else:
-                logger.warning(f"Dados JSON não encontrados para questão {ano}-{int(row['CO_POSICAO'])}")
+            for (idx, ano, posicao), dados_json in zip(tarefas, detalhes):
+                # Atualiza progresso
+                progress = idx / total
+                pct = int(progress * 100)
+                agora = time.monotonic()
+                if pct != ultimo_pct and agora - ultimo_t > self.INTERVALO_PROGRESSO:
+                    progress_bar.progress(progress)
+                    status_text.text(f"Processando questão {idx} de {total}...")
+                    ultimo_pct = pct
+                    ultimo_t = agora
+                
+                if dados_json:
+                    linha = {col: valores[idx - 1] for col, valores in colunas.items()}
+                    questao = self.processador.criar_objeto_questao(
+                        linha, dados_json, idx, ano
+                    )
+                    questoes.append(questao)
+                else:
+                    logger.warning(f"Dados JSON não encontrados para questão {ano}-{posicao}")
         
         progress_bar.empty()
         status_text.empty()
@@ -707,17 +1063,19 @@ class AplicacaoENEM:
             anos_texto = f"{anos_ordenados[0]}-{anos_ordenados[-1]}"
             nome_arquivo = f"ENEM_{anos_texto}_{num_questoes}_questoes.docx"
         
-        # Salva em buffer
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
+        # Salva em arquivo temporário e lê os bytes uma única vez: evita
+        # manter o BytesIO e a cópia de getvalue() na memória ao mesmo tempo
+        with tempfile.TemporaryDirectory() as pasta_temp:
+            caminho = Path(pasta_temp) / nome_arquivo
+            doc.save(caminho)
+            dados = caminho.read_bytes()
         
         # Oferece download
         st.success(f"✅ Documento gerado com {num_questoes} questões!")
         
         st.download_button(
             label="📥 Baixar DOCX",
-            data=buffer.getvalue(),
+            data=dados,
             file_name=nome_arquivo,
             mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             use_container_width=True
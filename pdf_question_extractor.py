@@ -1,151 +1,254 @@
 import os
 import json
 import re
+import shutil
+from collections import namedtuple
 import fitz  # PyMuPDF
-from PIL import Image
-import pytesseract
 from pathlib import Path
-import base64
-from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Padrões compilados uma única vez na importação do módulo
+
+# Início de questão (ex: "Questão 40", "40.", etc.), na ordem de prioridade;
+# aplicados ao texto em minúsculas, sem IGNORECASE
+_Q_PATTERNS = (
+    re.compile(r'questão\s+(\d+)'),
+    re.compile(r'^(\d+)\.', re.MULTILINE),
+    re.compile(r'question\s+(\d+)'),
+)
+
+# Ano da prova, com o intervalo válido (1990 a 2030) no próprio regex:
+# primeiro o ano após "ENEM", depois qualquer ano isolado no texto
+_YEAR_RANGE = r'(199\d|20[0-2]\d|2030)'
+_YEAR_ENEM = re.compile(r'ENEM\s+' + _YEAR_RANGE)
+_YEAR_ANY = re.compile(r'(?<!\d)' + _YEAR_RANGE + r'(?!\d)')
+
+# Alternativas: início de linha "A)" e o texto de cada alternativa, que vai
+# até o fim da linha (vazio se a linha seguinte já é outra alternativa)
+_ALT_LINE = re.compile(r'^[A-E]\)')
+_ALT_FULL = re.compile(r'^([A-E])\)\s*(?:(?<=\n)(?=[A-E]\))|([^\n]*))', re.MULTILINE)
+
+# Varredura do contexto em uma passada sobre o texto da página:
+#   - primeira linha com conteúdo substancial (mais de 30 caracteres sem os
+#     espaços das pontas e que não é uma alternativa)
+#   - eventos que encerram o contexto: linha de questão (no texto em
+#     minúsculas, como _Q_PATTERNS) ou de alternativa (no texto original)
+_CONTENT_LINE = re.compile(r'^[^\S\n]*(?![A-E]\))\S[^\n]{29,}?\S[^\S\n]*$', re.MULTILINE)
+_CONTEXT_Q = re.compile(r'(?:questão|question)[^\S\n]+\d+|^[^\S\n]*\d+\.', re.MULTILINE)
+_ALT_START = re.compile(r'^[^\S\n]*[A-E]\)', re.MULTILINE)
+
+# Conteúdo de cada linha não vazia, já sem os espaços das pontas
+_LINE_RE = re.compile(r'[^\S\n]*(\S(?:[^\n]*\S)?)')
+
+# Palavras-chave por disciplina, em ordem de prioridade
+_DISCIPLINES = {
+    'matematica': ['matemática', 'função', 'equação', 'gráfico', 'cálculo', 'geometria'],
+    'fisica': ['física', 'força', 'energia', 'movimento', 'velocidade', 'aceleração'],
+    'quimica': ['química', 'reação', 'átomo', 'molécula', 'elemento', 'composto'],
+    'biologia': ['biologia', 'célula', 'gene', 'dna', 'evolução', 'organismo'],
+    'ciencias-natureza': ['nanomateriais', 'nanopartículas', 'biotecnologia'],
+    'linguagens': ['texto', 'linguagem', 'literatura', 'gramática'],
+    'historia': ['história', 'século', 'guerra', 'império', 'revolução'],
+    'geografia': ['geografia', 'clima', 'população', 'território']
+}
+
+# Palavra-chave -> (prioridade, disciplina) e um único regex com todas as
+# palavras; o lookahead encontra também ocorrências sobrepostas
+_DISCIPLINE_BY_KEYWORD = {}
+for _ordem, (_discipline, _keywords) in enumerate(_DISCIPLINES.items()):
+    for _keyword in _keywords:
+        _DISCIPLINE_BY_KEYWORD.setdefault(_keyword, (_ordem, _discipline))
+_DISCIPLINE_SCAN = re.compile(
+    '(?=(' + '|'.join(map(re.escape, sorted(_DISCIPLINE_BY_KEYWORD, key=len, reverse=True))) + '))'
+)
+
+# Referências bibliográficas: uma única alternação, até o fim da linha
+# (aplicado ao texto em minúsculas, sem IGNORECASE)
+_REFS = re.compile(r'disponível em:[^\n]*|fonte:[^\n]*|adaptado[^\n]*')
+
+def _dumps_json(data, indent=False):
+    """Serializa em UTF-8, com orjson quando disponível e json caso contrário"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+def _loads_json(content):
+    """Decodifica JSON, com orjson quando disponível e json caso contrário"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+# Dados derivados do texto da página, calculados uma única vez e
+# compartilhados pelos extratores:
+#   - text: texto da página
+#   - lower: texto em minúsculas, com as mesmas posições de text
+#   - first_alt_offset: posição da primeira alternativa (fim do texto se não há)
+PageView = namedtuple('PageView', 'text lower first_alt_offset')
+
+def make_page_view(text):
+    """Monta o PageView de um texto de página"""
+    lower = text.lower()
+    if len(lower) != len(text):
+        # Raros caracteres (ex: "İ") mudam de tamanho em minúsculas; ficam
+        # como estão para manter as posições alinhadas com o texto original
+        lower = ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+    
+    alt = _ALT_START.search(text)
+    return PageView(text, lower, alt.start() if alt else len(text))
 
 class PDFQuestionExtractor:
-    def __init__(self, pdf_path, output_dir="questions"):
+    # Área mínima (largura x altura em pixels) para uma imagem ser extraída;
+    # abaixo disso são ícones decorativos
+    MIN_IMAGE_AREA = 400
+    
+    # Marcadores procurados pelo MuPDF antes da extração completa da página;
+    # a busca ignora maiúsculas apenas em ASCII, daí as duas grafias com "Ã"
+    QUESTION_MARKERS = ("Questão", "QUESTÃO", "Question")
+    
+    # Imagens RGB acima desta área (fotografias) são gravadas em JPEG, cuja
+    # codificação é bem mais barata que a do PNG; as demais ficam em PNG
+    JPEG_MIN_AREA = 40_000
+    JPEG_QUALITY = 85
+    
+    def __init__(self, pdf_path, output_dir="questions", skip_first_page=True, write_details=True):
         self.pdf_path = pdf_path
         self.output_dir = output_dir
+        self.skip_first_page = skip_first_page
+        self.write_details = write_details
+        self.exam_info = None
         self.doc = fitz.open(pdf_path)
         
+        # Arquivo PNG já gravado por xref (None se a imagem não é GRAY/RGB),
+        # já que logos e cabeçalhos se repetem entre as páginas
+        self._xref_cache = {}
+        
+        # questions.jsonl, aberto na primeira questão salva
+        self._jsonl = None
+        
+        # Diretórios de questão já criados, para não repetir o mkdir
+        self._dirs_made = set()
+        
         # Criar diretório de saída se não existir
         Path(self.output_dir).mkdir(exist_ok=True)
         
-    def extract_text_from_page(self, page_num):
+    def extract_text_from_page(self, page_num, textpage=None):
         """Extrai texto de uma página específica do PDF"""
         page = self.doc[page_num]
-        return page.get_text()
+        return page.get_text(textpage=textpage)
     
     def extract_images_from_page(self, page_num):
-        """Extrai imagens de uma página específica do PDF"""
+        """
+        Lista as imagens de uma página específica do PDF
+        
+        Só os metadados são lidos aqui; a imagem é decodificada e gravada
+        direto em disco por save_question_image.
+        """
         page = self.doc[page_num]
         images = []
         
         image_list = page.get_images()
         for img_index, img in enumerate(image_list):
-            xref = img[0]
-            pix = fitz.Pixmap(self.doc, xref)
+            xref, width, height = img[0], img[2], img[3]
+            if width * height < self.MIN_IMAGE_AREA:
+                continue
+            
+            # Imagem já conhecida como não GRAY/RGB
+            if xref in self._xref_cache and self._xref_cache[xref] is None:
+                continue
             
-            if pix.n - pix.alpha < 4:  # GRAY ou RGB
-                img_data = pix.tobytes("png")
-                images.append({
-                    "index": img_index,
-                    "data": img_data,
-                    "format": "png"
-                })
-            pix = None
+            images.append({
+                "index": img_index,
+                "xref": xref,
+                "width": width,
+                "height": height
+            })
             
         return images
     
     def identify_question_pattern(self, text):
         """Identifica padrões de questões no texto"""
-        # Padrão para identificar início de questão (ex: "Questão 40", "40.", etc.)
-        question_patterns = [
-            r'Questão\s+(\d+)',
-            r'^(\d+)\.',
-            r'QUESTÃO\s+(\d+)',
-            r'Question\s+(\d+)'
-        ]
-        
-        for pattern in question_patterns:
-            match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
+        # Caminho rápido para o caso mais comum, texto começando com "N.":
+        # sem "Questão" no texto, que tem prioridade, o número é o inicial
+        if text[:1].isdecimal():
+            i = 1
+            while i < len(text) and text[i].isdecimal():
+                i += 1
+            if text[i:i + 1] == '.' and 'quest' not in text.casefold():
+                return int(text[:i])
+        
+        # Padrões em minúsculas sobre o texto em minúsculas ("QUESTÃO" incluso)
+        text_lower = text.lower()
+        for pattern in _Q_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 return int(match.group(1))
         return None
     
-    def extract_year_from_text(self, text):
+    def extract_year_from_text(self, view):
         """Extrai o ano da prova do texto"""
-        year_patterns = [
-            r'ENEM\s+(\d{4})',
-            r'(\d{4})',  # Qualquer ano de 4 dígitos
-        ]
-        
-        for pattern in year_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                year = int(match)
-                if 1990 <= year <= 2030:  # Range válido para anos de prova
-                    return year
+        for pattern in (_YEAR_ENEM, _YEAR_ANY):
+            match = pattern.search(view.text)
+            if match:
+                return int(match.group(1))
         return None
     
-    def identify_discipline(self, text):
+    def identify_discipline(self, view):
         """Identifica a disciplina baseada no conteúdo"""
-        disciplines = {
-            'matematica': ['matemática', 'função', 'equação', 'gráfico', 'cálculo', 'geometria'],
-            'fisica': ['física', 'força', 'energia', 'movimento', 'velocidade', 'aceleração'],
-            'quimica': ['química', 'reação', 'átomo', 'molécula', 'elemento', 'composto'],
-            'biologia': ['biologia', 'célula', 'gene', 'dna', 'evolução', 'organismo'],
-            'ciencias-natureza': ['nanomateriais', 'nanopartículas', 'biotecnologia'],
-            'linguagens': ['texto', 'linguagem', 'literatura', 'gramática'],
-            'historia': ['história', 'século', 'guerra', 'império', 'revolução'],
-            'geografia': ['geografia', 'clima', 'população', 'território']
-        }
-        
-        text_lower = text.lower()
-        for discipline, keywords in disciplines.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return discipline
+        # Uma única varredura do texto; vence a disciplina de maior prioridade
+        best = None
+        for match in _DISCIPLINE_SCAN.finditer(view.lower):
+            ordem, discipline = _DISCIPLINE_BY_KEYWORD[match.group(1)]
+            if best is None or ordem < best[0]:
+                best = (ordem, discipline)
+                if ordem == 0:
+                    break
         
-        return 'geral'
+        return best[1] if best else 'geral'
     
-    def extract_context(self, text):
+    def extract_context(self, view):
         """Extrai o contexto da questão (texto introdutório)"""
-        lines = text.split('\n')
-        context_lines = []
+        text = view.text
         
         # Pula as primeiras linhas até encontrar o contexto
-        start_collecting = False
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Se encontrar um padrão de questão, para de coletar
-            if self.identify_question_pattern(line) and start_collecting:
-                break
-                
-            # Se a linha tem conteúdo substancial, começa a coletar
-            if len(line) > 30 and not re.match(r'^[A-E]\)', line):
-                start_collecting = True
-                
-            if start_collecting:
-                # Para se encontrar alternativas
-                if re.match(r'^[A-E]\)', line):
-                    break
-                context_lines.append(line)
-        
-        return '\n\n'.join(context_lines).strip()
+        inicio = _CONTENT_LINE.search(text)
+        if not inicio:
+            return ""
+        
+        # Para na primeira linha seguinte com padrão de questão ou alternativa;
+        # se a primeira alternativa vem depois do início, basta procurar até ela
+        fim = len(text)
+        limite = view.first_alt_offset if view.first_alt_offset > inicio.end() else len(text)
+        evento = _CONTEXT_Q.search(view.lower, inicio.end(), limite)
+        # Uma alternativa só importa se vier antes da linha de questão
+        alt = _ALT_START.search(text, inicio.end(), evento.start() if evento else limite)
+        if alt:
+            evento = alt
+        if evento:
+            fim = text.rfind('\n', 0, evento.start()) + 1
+        elif limite < len(text):
+            fim = limite
+        
+        context_lines = [m.group(1) for m in _LINE_RE.finditer(text, inicio.start(), fim)]
+        return '\n\n'.join(context_lines)
     
-    def extract_references(self, text):
+    def extract_references(self, view):
         """Extrai referências bibliográficas"""
-        # Padrões comuns de referências
-        ref_patterns = [
-            r'Disponível em:.*?(?:\n|$)',
-            r'Fonte:.*?(?:\n|$)',
-            r'[A-Z][^.]*\. Disponível em:.*?(?:\n|$)',
-            r'Adaptado.*?(?:\n|$)'
-        ]
-        
-        references = []
-        for pattern in ref_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-            references.extend(matches)
-        
-        return ' '.join(references).strip()
+        # Busca no texto em minúsculas e devolve o trecho original
+        text = view.text
+        return ' '.join(text[m.start():m.end()] for m in _REFS.finditer(view.lower)).strip()
     
-    def extract_alternatives(self, text):
+    def extract_alternatives(self, view):
         """Extrai as alternativas da questão"""
         alternatives = []
         
-        # Encontra todas as alternativas A, B, C, D, E
-        alt_pattern = r'^([A-E])\)\s*(.*?)(?=^[A-E]\)|$)'
-        matches = re.findall(alt_pattern, text, re.MULTILINE | re.DOTALL)
+        # Encontra todas as alternativas A, B, C, D, E, a partir da primeira
+        matches = _ALT_FULL.findall(view.text, view.first_alt_offset)
         
         for letter, alt_text in matches:
             alternatives.append({
@@ -157,55 +260,96 @@ class PDFQuestionExtractor:
         
         return alternatives
     
-    def extract_alternatives_introduction(self, text):
+    def extract_alternatives_introduction(self, view):
         """Extrai a introdução das alternativas"""
         # Procura por texto antes das alternativas
-        lines = text.split('\n')
-        intro_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if re.match(r'^[A-E]\)', line):
-                break
+        text = view.text
+        fim = view.first_alt_offset
+        
+        # Volta linha a linha a partir das alternativas até a última linha
+        # substancial que não seja o cabeçalho da questão
+        while fim > 0:
+            inicio = text.rfind('\n', 0, fim) + 1
+            line = text[inicio:fim].strip()
             if len(line) > 10 and not self.identify_question_pattern(line):
-                intro_lines.append(line)
-        
-        # Pega as últimas linhas antes das alternativas
-        if len(intro_lines) > 0:
-            return intro_lines[-1]
+                return line
+            fim = inicio - 1
         
         return ""
     
+    def _qdir(self, question_num):
+        """Retorna o diretório da questão, criando-o na primeira vez"""
+        question_dir = Path(self.output_dir) / str(question_num)
+        if question_num not in self._dirs_made:
+            question_dir.mkdir(exist_ok=True)
+            self._dirs_made.add(question_num)
+        return question_dir
+    
     def save_question_image(self, question_num, images):
         """Salva imagens da questão e retorna URLs"""
-        question_dir = Path(self.output_dir) / str(question_num)
-        question_dir.mkdir(exist_ok=True)
+        question_dir = self._qdir(question_num)
         
         image_files = []
-        for i, img in enumerate(images):
-            img_filename = f"image_{i}.png"
-            img_path = question_dir / img_filename
-            
-            with open(img_path, 'wb') as f:
-                f.write(img["data"])
+        for img in images:
+            img_path = question_dir / f"image_{len(image_files)}"
             
-            image_files.append(f"./questions/{question_num}/{img_filename}")
+            saved_path = self._save_image(img["xref"], img_path)
+            if saved_path is not None:
+                image_files.append(f"./questions/{question_num}/{saved_path.name}")
         
         return image_files
     
-    def process_question(self, page_num, text, images):
+    def _save_image(self, xref, img_path):
+        """
+        Grava a imagem de um xref, sem passar os bytes pelo Python.
+        
+        Args:
+            xref: Referência da imagem no PDF
+            img_path: Caminho do arquivo, sem extensão
+        
+        Returns:
+            Caminho gravado (.jpg ou .png), ou None se a imagem não é GRAY/RGB
+        """
+        if xref in self._xref_cache:
+            cached_path = self._xref_cache[xref]
+            if cached_path is None:
+                return None
+            
+            # Imagem repetida: copia o arquivo em vez de codificar de novo
+            saved_path = img_path.with_suffix(cached_path.suffix)
+            if saved_path != cached_path:
+                shutil.copyfile(cached_path, saved_path)
+            return saved_path
+        
+        pix = fitz.Pixmap(self.doc, xref)
+        saved_path = None
+        if pix.n == 3 and pix.width * pix.height > self.JPEG_MIN_AREA:  # RGB sem alfa
+            saved_path = img_path.with_suffix(".jpg")
+            pix.save(str(saved_path), jpg_quality=self.JPEG_QUALITY)
+        elif pix.n - pix.alpha < 4:  # GRAY ou RGB
+            saved_path = img_path.with_suffix(".png")
+            pix.save(str(saved_path))
+        pix = None
+        
+        self._xref_cache[xref] = saved_path
+        return saved_path
+    
+    def process_question(self, page_num, text, images, question_num=None):
         """Processa uma questão individual"""
-        question_num = self.identify_question_pattern(text)
+        # O número já identificado pelo chamador evita uma nova busca no texto
+        if question_num is None:
+            question_num = self.identify_question_pattern(text)
         if not question_num:
             return None
         
         # Extrair informações
-        year = self.extract_year_from_text(text)
-        discipline = self.identify_discipline(text)
-        context = self.extract_context(text)
-        references = self.extract_references(text)
-        alternatives = self.extract_alternatives(text)
-        alt_intro = self.extract_alternatives_introduction(text)
+        view = make_page_view(text)
+        year = self.extract_year_from_text(view)
+        discipline = self.identify_discipline(view)
+        context = self.extract_context(view)
+        references = self.extract_references(view)
+        alternatives = self.extract_alternatives(view)
+        alt_intro = self.extract_alternatives_introduction(view)
         
         # Salvar imagens se existirem
         image_files = []
@@ -229,54 +373,142 @@ class PDFQuestionExtractor:
         
         return question_data
     
+    def process_page(self, page_num):
+        """
+        Extrai a questão de uma página, salvando suas imagens.
+        
+        Returns:
+            Tupla (dados da questão ou None, número de imagens da página)
+        """
+        # Capa, instruções e gabarito não têm cabeçalho de questão: evita
+        # extrair texto e imagens dessas páginas. O TextPage é montado uma
+        # única vez e serve às buscas e à extração do texto
+        page = self.doc[page_num]
+        textpage = page.get_textpage()
+        if not any(page.search_for(marker, textpage=textpage) for marker in self.QUESTION_MARKERS):
+            return None, 0
+        
+        text = self.extract_text_from_page(page_num, textpage)
+        images = self.extract_images_from_page(page_num)
+        
+        # Se encontrou uma questão na página; o número é identificado uma
+        # única vez e repassado para o processamento da questão
+        question_data = None
+        question_num = self.identify_question_pattern(text)
+        if question_num:
+            question_data = self.process_question(page_num, text, images, question_num)
+        
+        # Libera os recursos decodificados pelo MuPDF (fontes, imagens) para
+        # que a memória não cresça ao longo de PDFs longos
+        fitz.TOOLS.store_shrink(100)
+        
+        return question_data, len(images)
+    
     def save_question_data(self, question_data):
-        """Salva os dados da questão em arquivo JSON"""
-        question_num = question_data["index"]
-        question_dir = Path(self.output_dir) / str(question_num)
-        question_dir.mkdir(exist_ok=True)
+        """
+        Salva os dados da questão como uma linha do questions.jsonl
+        
+        Todas as questões vão para um único arquivo aberto; os details.json
+        de cada questão são gerados de uma vez em finalize().
+        """
+        if self._jsonl is None:
+            self._jsonl = open(Path(self.output_dir) / "questions.jsonl", 'wb')
+        
+        self._jsonl.write(_dumps_json(question_data) + b'\n')
+        print(f"Questão {question_data['index']} salva em: {self._jsonl.name}")
+    
+    def finalize(self):
+        """Fecha o questions.jsonl e gera o details.json de cada questão"""
+        if self._jsonl is None:
+            return
         
-        details_path = question_dir / "details.json"
-        with open(details_path, 'w', encoding='utf-8') as f:
-            json.dump(question_data, f, ensure_ascii=False, indent=4)
+        self._jsonl.close()
+        jsonl_path = self._jsonl.name
+        self._jsonl = None
         
-        print(f"Questão {question_num} salva em: {details_path}")
+        if not self.write_details:
+            return
+        
+        with open(jsonl_path, 'rb') as f:
+            for line in f:
+                question_data = _loads_json(line)
+                question_dir = self._qdir(question_data["index"])
+                (question_dir / "details.json").write_bytes(_dumps_json(question_data, indent=True))
     
     def extract_all_questions(self):
-        """Extrai todas as questões do PDF"""
-        extracted_questions = []
+        """
+        Extrai todas as questões do PDF
         
+        Gerador: cada questão é entregue assim que sua página é processada,
+        sem acumular todas em memória. Use list() para obter a lista.
+        """
         # Começar da página 1 se skip_first_page estiver ativo
         start_page = 1 if self.skip_first_page else 0
         
         print(f"📖 Processando páginas {start_page + 1} até {len(self.doc)} (ignorando capa: {self.skip_first_page})")
         
-        for page_num in range(start_page, len(self.doc)):
-            try:
-                text = self.extract_text_from_page(page_num)
-                images = self.extract_images_from_page(page_num)
-                
-                # Debug: mostrar quantas imagens foram filtradas
-                if images:
-                    print(f"   Página {page_num + 1}: {len(images)} imagem(ns) relevante(s) encontrada(s)")
-                
-                # Se encontrou uma questão na página
-                if self.identify_question_pattern(text):
-                    question_data = self.process_question(page_num, text, images)
+        # As páginas são processadas em paralelo, cada processo com o seu
+        # próprio documento; os JSON são gravados aqui, em sequência
+        pages = range(start_page, len(self.doc))
+        worker = partial(_process_page, self.pdf_path, output_dir=self.output_dir)
+        
+        # Cada processo recebe um intervalo contíguo de páginas: logos e
+        # cabeçalhos repetidos em páginas vizinhas caem no mesmo _xref_cache
+        workers = os.cpu_count() or 1
+        chunksize = max(1, -(-len(pages) // workers))
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(worker, pages, chunksize=chunksize)
+            for page_num, (question_data, num_images, error) in zip(pages, results):
+                try:
+                    if error:
+                        raise RuntimeError(error)
+                    
+                    # Debug: mostrar quantas imagens foram filtradas
+                    if num_images:
+                        print(f"   Página {page_num + 1}: {num_images} imagem(ns) relevante(s) encontrada(s)")
                     
                     if question_data:
                         self.save_question_data(question_data)
-                        extracted_questions.append(question_data)
                         
-            except Exception as e:
-                print(f"❌ Erro ao processar página {page_num + 1}: {str(e)}")
-                continue
-        
-        return extracted_questions
+                except Exception as e:
+                    print(f"❌ Erro ao processar página {page_num + 1}: {str(e)}")
+                    continue
+                
+                if question_data:
+                    yield question_data
     
     def close(self):
-        """Fecha o documento PDF"""
+        """Finaliza os arquivos de saída e fecha o documento PDF"""
+        self.finalize()
         self.doc.close()
 
+# Extrator do processo de trabalho, reaproveitado entre as páginas
+_worker_extractor = None
+
+def _process_page(pdf_path, page_num, output_dir):
+    """
+    Processa uma página em um processo de trabalho.
+    
+    Cada processo abre o seu próprio documento, já que os documentos do
+    PyMuPDF não podem ser compartilhados entre processos.
+    
+    Returns:
+        Tupla (dados da questão ou None, número de imagens, erro ou None)
+    """
+    global _worker_extractor
+    
+    try:
+        extractor = _worker_extractor
+        if extractor is None or (extractor.pdf_path, extractor.output_dir) != (pdf_path, output_dir):
+            if extractor is not None:
+                extractor.close()
+            extractor = _worker_extractor = PDFQuestionExtractor(pdf_path, output_dir)
+        
+        return extractor.process_page(page_num) + (None,)
+    except Exception as e:
+        return None, 0, str(e)
+
 def main():
     """Função principal"""
     print("=== Extrator de Questões ENEM ===")
@@ -309,19 +541,19 @@ def main():
     
     try:
         print("\n📚 Iniciando extração de questões...")
-        questions = extractor.extract_all_questions()
+        
+        # Mostra cada questão assim que é extraída, sem guardar a lista
+        count = 0
+        for q in extractor.extract_all_questions():
+            count += 1
+            print(f"   • Questão {q['index']}: {q['title']} [{q['discipline']}]")
         
         print(f"\n✅ Extração concluída!")
-        print(f"📊 Total de questões extraídas: {len(questions)}")
+        print(f"📊 Total de questões extraídas: {count}")
         
         if extractor.exam_info:
             print(f"📋 Informações do exame: {extractor.exam_info}")
         
-        # Mostrar resumo
-        print("\n📝 Questões extraídas:")
-        for q in questions:
-            print(f"   • Questão {q['index']}: {q['title']} [{q['discipline']}]")
-        
         print(f"\n📁 Arquivos salvos em: ./questions/")
         print("\n⚠️  Lembre-se de definir manualmente as alternativas corretas nos arquivos details.json!")
             